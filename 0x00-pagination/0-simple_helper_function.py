@@ -2,8 +2,14 @@
 """
 Pagination example
 """
+from array import array
+from itertools import repeat
+from typing import Any, Tuple
 
-from typing import Tuple
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -22,3 +28,52 @@ def index_range(page: int, page_size: int) -> Tuple[int, int]:
     start_index = (page - 1) * page_size
     end_index = start_index + page_size
     return start_index, end_index
+
+
+def index_ranges(pages, page_sizes) -> Tuple[Any, Any]:
+    """
+    Calculates start and end indices for many pages in one pass.
+
+    Parameters:
+    - pages: page numbers (1-based), as a NumPy array or any sequence
+      or buffer of ints such as ``array('q')``.
+    - page_sizes: items per page, either one int for every page or a
+      sequence of the same length as ``pages``.
+
+    Returns:
+    - Tuple: the start indices (inclusive) and end indices (exclusive).
+      NumPy arrays come back for NumPy input, ``array('q')`` otherwise.
+
+    Like ``get_page``, every page and page size must be an int above 0.
+    """
+    if np is not None:
+        np_pages = np.asarray(pages)
+        np_sizes = np.asarray(page_sizes)
+        assert np_pages.ndim == 1
+        assert np_sizes.ndim == 0 or np_sizes.shape == np_pages.shape
+        for values in (np_pages, np_sizes):
+            assert values.size == 0 or (values.dtype.kind in "iu"
+                                        and values.min() > 0)
+        # int64 * uint64 promotes to float64, so cast both sides
+        np_sizes = np_sizes.astype(np.int64)
+        starts = (np_pages.astype(np.int64) - 1) * np_sizes
+        ends = starts + np_sizes
+        if isinstance(pages, np.ndarray):
+            return starts, ends
+        return (array('q', starts.astype(np.int64).tobytes()),
+                array('q', ends.astype(np.int64).tobytes()))
+
+    # reject what the NumPy branch rejects, with the same AssertionError
+    assert hasattr(pages, "__len__")
+    assert all(isinstance(p, int) for p in pages)
+    if isinstance(page_sizes, int):
+        page_sizes = repeat(page_sizes, len(pages))
+    else:
+        assert hasattr(page_sizes, "__len__")
+        assert all(isinstance(s, int) for s in page_sizes)
+    pages, page_sizes = array('q', pages), array('q', page_sizes)
+    assert len(pages) == len(page_sizes)
+    assert not pages or (min(pages) > 0 and min(page_sizes) > 0)
+    starts = array('q', [(p - 1) * s for p, s in zip(pages, page_sizes)])
+    ends = array('q', [start + s for start, s in zip(starts, page_sizes)])
+    return starts, ends
@@ -4,7 +4,10 @@ Pagination example
 """
 import csv
 import math
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Sequence
+
+from dataset_backends import open_dataset
+from secondary_index import SecondaryIndex
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -30,13 +33,24 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, backend: str = "list"):
+        """
+        Parameters:
+        - backend (str): "list" parses the whole file into memory,
+          "index" keeps only row offsets and reads pages from disk,
+          "mmap" reads those pages through a shared memory map,
+          "columnar" keeps compact array-backed columns in memory.
+        """
+        self.backend = backend
         self.__dataset = None
+        self.__secondary_index = None
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Cached dataset
         """
-        if self.__dataset is None:
+        if self.__dataset is None and self.backend != "list":
+            self.__dataset = open_dataset(self.DATA_FILE, self.backend)
+        elif self.__dataset is None:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
@@ -44,13 +58,25 @@ class Server:
 
         return self.__dataset
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def secondary_index(self) -> SecondaryIndex:
+        """Filter and sort indexes, built on first use
+        """
+        if self.__secondary_index is None:
+            self.__secondary_index = SecondaryIndex(self.dataset())
+        return self.__secondary_index
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 filters: Optional[Dict[str, Any]] = None,
+                 sort: Optional[str] = None) -> List[List]:
         """
         Retrieves a page of data from the dataset.
 
         Parameters:
         - page (int): The current page number (1-based).
         - page_size (int): The number of items per page.
+        - filters (dict): optional "year", "gender", "ethnicity" and
+          "name_prefix" constraints.
+        - sort (str): optional "count", "rank", "-count" or "-rank".
 
         Returns:
         - List[List]: A list of rows from the dataset for the specified page.
@@ -67,28 +93,59 @@ class Server:
         # unpack start and end point
         start_index, end_index = index_range(page, page_size)
 
+        if filters or sort:
+            positions = self.secondary_index().page(
+                filters, sort, start_index, end_index)
+            return [all_data[i] for i in positions]
+
         if start_index >= len(all_data):
             return []
 
         paginated_data = all_data[start_index:end_index]
         return paginated_data
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+    def get_hyper(self, page: int = 1, page_size: int = 10,
+                  filters: Optional[Dict[str, Any]] = None,
+                  sort: Optional[str] = None,
+                  estimate: bool = False) -> Dict[str, Any]:
         """
         Returns paginated data with hypermedia metadata.
+
+        With ``estimate`` and filters, ``total_pages`` may be approximated
+        from a sample of rows rather than an exact count; the response
+        then carries ``"estimated": True``. ``next_page`` is always
+        exact, so following it reaches every matching row.
         """
         # get the data per page
-        page_data = self.get_page(page, page_size)
+        page_data = self.get_page(page, page_size, filters, sort)
 
-        total_items = len(self.dataset())
+        if filters:
+            total_items = self.secondary_index().count(filters, estimate)
+        else:
+            total_items = len(self.dataset())
         total_pages = math.ceil(total_items / page_size)
+        next_page = page + 1 if page < total_pages else None
+        if filters and estimate:
+            # look for one more matching row rather than trusting the
+            # sample about whether the next page exists
+            _, end_index = index_range(page, page_size)
+            if self.secondary_index().page(filters, sort, end_index,
+                                           end_index + 1):
+                next_page = page + 1
+                total_pages = max(total_pages, next_page)
+            else:
+                next_page = None
+                if page_data:
+                    total_pages = page
 
         hypermedia = {
             "page_size": len(page_data),
             "page": page,
             "data": page_data,
-            "next_page": page + 1 if page < total_pages else None,
+            "next_page": next_page,
             "prev_page": page - 1 if page > 1 else None,
             "total_pages": total_pages
         }
+        if filters and estimate:
+            hypermedia["estimated"] = True
         return hypermedia
@@ -2,9 +2,17 @@
 """
 Pagination example
 """
-import csv
 import math
-from typing import List, Tuple, Dict, Any
+import time
+from typing import (List, Tuple, Dict, Any, Iterable, Iterator, Optional,
+                    Sequence)
+
+from dataset_server import DatasetServer, DatasetState
+from instrumentation import Metrics, timed
+from page_cache import PageCache, ReadAhead
+from secondary_index import SecondaryIndex
+
+index_ranges = __import__('0-simple_helper_function').index_ranges
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -25,70 +33,274 @@ def index_range(page: int, page_size: int) -> Tuple[int, int]:
     return start_index, end_index
 
 
-class Server:
+class Server(DatasetServer):
     """Server class to paginate a database of popular baby names.
     """
-    DATA_FILE = "Popular_Baby_Names.csv"
+    # rows read per slice by the batch APIs
+    READ_BLOCK_ROWS = 65536
+
+    def __init__(self, backend: str = "list", readahead: int = 0,
+                 readbehind: bool = False, cache_pages: int = 64,
+                 reload_interval: float = 0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Parameters:
+        - backend (str): "list" parses the whole file into memory,
+          "index" keeps only row offsets and reads pages from disk,
+          "mmap" reads those pages through a shared memory map,
+          "columnar" keeps compact array-backed columns in memory,
+          "gzip" reads pages from a block-compressed DATA_FILE.
+        - readahead (int): after serving page N, warm pages N+1 to
+          N+readahead in the background. 0 disables the page cache.
+        - readbehind (bool): also warm page N-1.
+        - cache_pages (int): capacity of the page cache.
+        - reload_interval (float): when above 0, ``dataset()`` checks
+          DATA_FILE for appended rows at most this often (in seconds)
+          and calls ``reload()``.
+        - metrics (Metrics): records per-method latencies, dataset load
+          and index build times; None turns instrumentation off.
+        """
+        super().__init__(backend, reload_interval, metrics)
+        self.readahead = readahead
+        self.readbehind = readbehind
+        self.__page_cache = None
+        self.__read_ahead = None
+        if readahead > 0 or readbehind:
+            self.__page_cache = PageCache(cache_pages)
+            self.__read_ahead = ReadAhead(self.__page_cache)
 
-    def __init__(self):
-        self.__dataset = None
+    def _dataset_changed(self, state: DatasetState, previous: DatasetState,
+                         appended: bool) -> None:
+        """Drops the cached pages of the old dataset
+        """
+        if self.__page_cache is not None:
+            self.__page_cache.clear()
 
-    def dataset(self) -> List[List]:
-        """Cached dataset
+    def __build_index(self, dataset: Sequence[List]) -> SecondaryIndex:
+        """Builds the filter and sort indexes of ``dataset``
         """
-        if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+        start = time.perf_counter()
+        index = SecondaryIndex(dataset)
+        if self.metrics is not None:
+            self.metrics.observe("index_build", time.perf_counter() - start)
+        return index
 
-        return self.__dataset
+    def __index_of(self, state: DatasetState) -> SecondaryIndex:
+        """Filter and sort indexes of one state, built on first use
+        """
+        return state.derived("secondary_index", self.__build_index)
+
+    def secondary_index(self) -> SecondaryIndex:
+        """Filter and sort indexes, built on first use
+        """
+        return self.__index_of(self.state())
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Page cache hit statistics, or None when read-ahead is off
+        """
+        if self.__page_cache is None:
+            return None
+        return self.__page_cache.stats()
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 filters: Optional[Dict[str, Any]] = None,
+                 sort: Optional[str] = None) -> List[List]:
         """
         Retrieves a page of data from the dataset.
 
         Parameters:
         - page (int): The current page number (1-based).
         - page_size (int): The number of items per page.
+        - filters (dict): optional "year", "gender", "ethnicity" and
+          "name_prefix" constraints.
+        - sort (str): optional "count", "rank", "-count" or "-rank".
 
         Returns:
         - List[List]: A list of rows from the dataset for the specified page.
           If page or page_size is out of range, returns an empty list.
         """
+        return self.__get_page(self.state(), page, page_size, filters, sort)
+
+    @timed("get_page")
+    def __get_page(self, state: DatasetState, page: int, page_size: int,
+                   filters: Optional[Dict[str, Any]],
+                   sort: Optional[str]) -> List[List]:
+        """``get_page`` on one state, through the page cache if enabled
+        """
         # Use assert to verify that both arguments
         # are integers greater than 0.
         assert isinstance(page, int) and page > 0
         assert isinstance(page_size, int) and page_size > 0
 
+        if self.__page_cache is None:
+            return self.__read_page(state, page, page_size, filters, sort)
+
+        # pages read from a dataset reload() has since replaced are not
+        # stored, and keys of earlier datasets are never looked up again
+        generation = state.generation
+
+        def current() -> bool:
+            return self.generation == generation
+
+        key = (generation, page, page_size, self.__filter_key(filters), sort)
+        page_data = self.__page_cache.get(key)
+        if page_data is None:
+            page_data = self.__read_page(state, page, page_size, filters,
+                                         sort)
+            if current():
+                self.__page_cache.put(key, page_data)
+
+        neighbours = list(range(page + 1, page + 1 + self.readahead))
+        if self.readbehind and page > 1:
+            neighbours.append(page - 1)
+        for other in neighbours:
+            if not filters and (other - 1) * page_size >= len(state.dataset):
+                continue
+            self.__read_ahead.schedule(
+                (generation, other, page_size, key[3], sort),
+                lambda p=other: self.__read_page(state, p, page_size,
+                                                 filters, sort),
+                current)
+        return list(page_data)
+
+    @staticmethod
+    def __filter_key(filters: Optional[Dict[str, Any]]) -> Tuple:
+        """Hashable form of the filters, for page cache keys
+        """
+        return tuple(sorted((k, str(v)) for k, v in (filters or {}).items()))
+
+    def __read_page(self, state: DatasetState, page: int, page_size: int,
+                    filters: Optional[Dict[str, Any]],
+                    sort: Optional[str]) -> List[List]:
+        """Reads a page from one state, bypassing the page cache
+        """
         # Get the dataset for pagination
-        all_data = self.dataset()
+        all_data = state.dataset
 
         # unpack start and end point
         start_index, end_index = index_range(page, page_size)
 
+        if filters or sort:
+            positions = self.__index_of(state).page(
+                filters, sort, start_index, end_index)
+            return [all_data[i] for i in positions]
+
         if start_index >= len(all_data):
             return []
 
         paginated_data = all_data[start_index:end_index]
         return paginated_data
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+    @timed("get_hyper")
+    def get_hyper(self, page: int = 1, page_size: int = 10,
+                  filters: Optional[Dict[str, Any]] = None,
+                  sort: Optional[str] = None,
+                  estimate: bool = False) -> Dict[str, Any]:
         """
         Returns paginated data with hypermedia metadata.
+
+        With ``estimate`` and filters, ``total_pages`` may be approximated
+        from a sample of rows rather than an exact count; the response
+        then carries ``"estimated": True``. ``next_page`` is always
+        exact, so following it reaches every matching row.
         """
+        state = self.state()
         # get the data per page
-        page_data = self.get_page(page, page_size)
+        page_data = self.__get_page(state, page, page_size, filters, sort)
 
-        total_items = len(self.dataset())
+        if filters:
+            total_items = self.__index_of(state).count(filters, estimate)
+        else:
+            total_items = len(state.dataset)
         total_pages = math.ceil(total_items / page_size)
+        next_page = page + 1 if page < total_pages else None
+        if filters and estimate:
+            # look for one more matching row rather than trusting the
+            # sample about whether the next page exists
+            _, end_index = index_range(page, page_size)
+            if self.__index_of(state).page(filters, sort, end_index,
+                                           end_index + 1):
+                next_page = page + 1
+                total_pages = max(total_pages, next_page)
+            else:
+                next_page = None
+                if page_data:
+                    total_pages = page
 
         hypermedia = {
             "page_size": len(page_data),
             "page": page,
             "data": page_data,
-            "next_page": page + 1 if page < total_pages else None,
+            "next_page": next_page,
             "prev_page": page - 1 if page > 1 else None,
             "total_pages": total_pages
         }
+        if filters and estimate:
+            hypermedia["estimated"] = True
         return hypermedia
+
+    @timed("get_pages")
+    def get_pages(self, pages: Iterable[int], page_size: int = 10,
+                  filters: Optional[Dict[str, Any]] = None,
+                  sort: Optional[str] = None) -> List[List[List]]:
+        """
+        Retrieves several pages at once, in the order requested.
+
+        Arguments are validated and ranges computed once for the whole
+        batch, and each run of consecutive pages is read with a single
+        slice of the dataset.
+        """
+        pages = list(pages)
+        assert isinstance(page_size, int) and page_size > 0
+        ranges = list(zip(*index_ranges(pages, page_size)))
+        state = self.state()
+        all_data = state.dataset
+
+        if filters or sort:
+            positions = self.__index_of(state).lookup(filters, sort)
+            return [[all_data[i] for i in positions[start:end]]
+                    for start, end in ranges]
+
+        result: List[List[List]] = []
+        i = 0
+        while i < len(pages):
+            j = i + 1
+            while j < len(pages) and pages[j] == pages[j - 1] + 1:
+                j += 1
+            run_start, run_end = ranges[i][0], ranges[j - 1][1]
+            rows = all_data[run_start:run_end]
+            result.extend(rows[start - run_start:end - run_start]
+                          for start, end in ranges[i:j])
+            i = j
+        return result
+
+    def iter_pages(self, page_size: int = 10, start: int = 1,
+                   filters: Optional[Dict[str, Any]] = None,
+                   sort: Optional[str] = None) -> Iterator[List[List]]:
+        """
+        Yields every page from ``start`` to the last one.
+
+        Rows are read in blocks of about READ_BLOCK_ROWS, so a full export
+        needs one sequential pass and never holds the whole dataset. The
+        pages all come from the dataset loaded when iteration began.
+        """
+        assert isinstance(start, int) and start > 0
+        assert isinstance(page_size, int) and page_size > 0
+
+        state = self.state()
+        all_data = state.dataset
+        positions = None
+        total = len(all_data)
+        if filters or sort:
+            positions = self.__index_of(state).lookup(filters, sort)
+            total = len(positions)
+
+        first_row, _ = index_range(start, page_size)
+        block = page_size * max(1, self.READ_BLOCK_ROWS // page_size)
+        for offset in range(first_row, total, block):
+            if positions is None:
+                rows = all_data[offset:offset + block]
+            else:
+                rows = [all_data[i] for i in positions[offset:offset + block]]
+            for i in range(0, len(rows), page_size):
+                yield rows[i:i + page_size]
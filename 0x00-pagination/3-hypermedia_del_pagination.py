@@ -3,62 +3,112 @@
 Deletion-resilient hypermedia pagination
 """
 
-import csv
-import math
-from typing import List, Dict
+import base64
+import binascii
+import time
+import struct
+from typing import List, Dict, Mapping, Optional, Sequence, Tuple
 
+from dataset_server import DatasetServer, DatasetState
+from instrumentation import Metrics, timed
+from live_index import LiveIndex, LiveRows
+from page_cache import PageCache, ReadAhead
 
-class Server:
+
+# cursor version, resume position, dataset row count
+CURSOR_FORMAT = struct.Struct("=BQQ")
+CURSOR_VERSION = 1
+
+
+class Server(DatasetServer):
     """Server class to paginate a database of popular baby names.
     """
-    DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
-        self.__dataset = None
-        self.__indexed_dataset = None
+    def __init__(self, backend: str = "list", readahead: int = 0,
+                 cache_pages: int = 64, reload_interval: float = 0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Parameters:
+        - backend (str): storage backend for the rows, as accepted by
+          ``dataset_backends.open_dataset``, or "list" to parse the whole
+          file into memory.
+        - readahead (int): after serving a page, warm the next readahead
+          pages (following ``next_index``) in the background. 0 disables
+          the page cache.
+        - cache_pages (int): capacity of the page cache.
+        - reload_interval (float): when above 0, ``dataset()`` checks
+          DATA_FILE for appended rows at most this often (in seconds)
+          and calls ``reload()``.
+        - metrics (Metrics): records per-method latencies, dataset load
+          and index build times; None turns instrumentation off.
+        """
+        super().__init__(backend, reload_interval, metrics)
+        self.readahead = readahead
+        self.__page_cache = None
+        self.__read_ahead = None
+        if readahead > 0:
+            self.__page_cache = PageCache(cache_pages)
+            self.__read_ahead = ReadAhead(self.__page_cache)
+
+    def _dataset_changed(self, state: DatasetState, previous: DatasetState,
+                         appended: bool) -> None:
+        """
+        Moves the live rows over to the new dataset, keeping deletions
+        when rows were only appended, and drops the cached pages
+        """
+        rows = previous.built("live_rows")
+        if rows is not None and appended:
+            live = rows.live.extended(len(state.dataset))
+            state.derived("live_rows", lambda dataset: LiveRows(dataset, live))
+        if self.__page_cache is not None:
+            self.__page_cache.clear()
 
-    def dataset(self) -> List[List]:
-        """Cached dataset
+    def __build_rows(self, dataset: Sequence[List]) -> LiveRows:
+        """Returns a view of ``dataset`` with every row live
         """
-        if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+        start = time.perf_counter()
+        rows = LiveRows(dataset, LiveIndex(len(dataset)))
+        if self.metrics is not None:
+            self.metrics.observe("index_build", time.perf_counter() - start)
+        return rows
 
-        return self.__dataset
+    def __rows_of(self, state: DatasetState) -> LiveRows:
+        """Live rows of one state, built on first use
+        """
+        return state.derived("live_rows", self.__build_rows)
 
-    def indexed_dataset(self) -> Dict[int, List]:
+    def indexed_dataset(self) -> Mapping[int, List]:
         """Dataset indexed by sorting position, starting at 0
+
+        Deleting a key (``del server.indexed_dataset()[i]``) removes that
+        row from later pages.
+        """
+        return self.__rows_of(self.state())
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Page cache hit statistics, or None when read-ahead is off
         """
-        if self.__indexed_dataset is None:
-            dataset = self.dataset()
-            truncated_dataset = dataset[:1000]
-            self.__indexed_dataset = {
-                i: dataset[i] for i in range(len(dataset))
-            }
-        return self.__indexed_dataset
+        if self.__page_cache is None:
+            return None
+        return self.__page_cache.stats()
 
+    @timed("get_hyper_index")
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """
         Return a dictionary with pagination data.
+
+        Deleted rows are skipped in O(log n) each, however many of them
+        sit between ``index`` and the next live row.
         """
-        assert index is None or (0 <= index < len(self.indexed_dataset()))
+        if index is None:
+            index = 0
+        state = self.state()
+        # positions keep their original numbering after deletes
+        assert 0 <= index < self.__rows_of(state).live.size
         assert page_size > 0
 
-        indexed_data = self.indexed_dataset()
-        page_data = []
-        current_index = index
-
-        while len(page_data) < page_size and current_index < len(indexed_data):
-            if current_index in indexed_data:
-                page_data.append(indexed_data[current_index])
-            current_index += 1
-
-        if current_index < len(indexed_data):
-            next_index = current_index
-        else:
-            next_index = None
+        page_data, next_index = self.__cached_page_from(state, index,
+                                                        page_size)
 
         return {
             'index': index,
@@ -66,3 +116,133 @@ class Server:
             'page_size': len(page_data),
             'data': page_data
         }
+
+    def __page_from(self, state: DatasetState, index: int,
+                    page_size: int) -> Tuple[List[List], Optional[int]]:
+        """
+        Returns up to page_size live rows at or after position ``index``
+        and the position the following page starts at, or None.
+        """
+        indexed_data = self.__rows_of(state)
+        positions = indexed_data.live.next_live(index, page_size)
+        page_data = indexed_data.rows_at(positions)
+
+        next_index = None
+        if len(positions) == page_size:
+            if positions[-1] + 1 < indexed_data.live.size:
+                next_index = positions[-1] + 1
+        return page_data, next_index
+
+    def __cached_page_from(self, state: DatasetState, index: int,
+                           page_size: int
+                           ) -> Tuple[List[List], Optional[int]]:
+        """
+        Like ``__page_from``, through the page cache when read-ahead is
+        on. Cache keys carry the dataset generation and the number of
+        deletions so far, so pages cached before a reload or a delete
+        are never served after it.
+        """
+        if self.__page_cache is None:
+            return self.__page_from(state, index, page_size)
+
+        generation = state.generation
+        live = self.__rows_of(state).live
+        version = (generation, live.size - len(live))
+        key = (index, page_size, version)
+        cached = self.__page_cache.get(key)
+        if cached is None:
+            cached = self.__page_from(state, index, page_size)
+            if self.generation == generation:
+                self.__page_cache.put(key, cached)
+
+        self.__prefetch(state, cached[1], page_size, version, self.readahead)
+        return list(cached[0]), cached[1]
+
+    def __prefetch(self, state: DatasetState, index: Optional[int],
+                   page_size: int, version: Tuple[int, int],
+                   depth: int) -> None:
+        """Warms the page at ``index`` and, from it, depth - 1 more
+        """
+        if index is None or depth <= 0:
+            return
+
+        def load():
+            page = self.__page_from(state, index, page_size)
+            self.__prefetch(state, page[1], page_size, version, depth - 1)
+            return page
+
+        def current() -> bool:
+            # a page read from a dataset reload() replaced is dropped
+            return self.generation == version[0]
+        self.__read_ahead.schedule((index, page_size, version), load,
+                                   current)
+
+    def encode_cursor(self, index: int) -> str:
+        """Returns the opaque continuation token for row position ``index``
+        """
+        return self.__encode_cursor(self.state(), index)
+
+    def __encode_cursor(self, state: DatasetState, index: int) -> str:
+        """``encode_cursor`` against the rows of one state
+        """
+        raw = CURSOR_FORMAT.pack(CURSOR_VERSION, index,
+                                 self.__rows_of(state).live.size)
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> Optional[int]:
+        """
+        Returns the row position a token resumes at, or None if the token
+        is malformed or was issued for a larger dataset. Tokens stay valid
+        while rows are appended by ``reload()``.
+        """
+        return self.__decode_cursor(self.state(), cursor)
+
+    def __decode_cursor(self, state: DatasetState,
+                        cursor: str) -> Optional[int]:
+        """``decode_cursor`` against the rows of one state
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            version, index, size = CURSOR_FORMAT.unpack(raw)
+        except (binascii.Error, struct.error, TypeError, ValueError):
+            return None
+        if version != CURSOR_VERSION:
+            return None
+        if size > self.__rows_of(state).live.size or index >= size:
+            return None
+        return index
+
+    @timed("get_cursor_page")
+    def get_cursor_page(self, cursor: str = None,
+                        page_size: int = 10) -> Dict:
+        """
+        Return a page of live rows starting at an opaque cursor.
+
+        Parameters:
+        - cursor (str): a ``next_cursor`` from a previous call, or None
+          for the first page.
+        - page_size (int): The number of items per page.
+
+        Returns:
+        - Dict: the page ``data``, its ``page_size``, the ``cursor`` it
+          was read from and the ``next_cursor`` (None on the last page).
+          Rows deleted between calls are skipped, as with
+          ``get_hyper_index``, and resuming costs the same at any depth.
+        """
+        assert isinstance(page_size, int) and page_size > 0
+        state = self.state()
+        index = 0
+        if cursor is not None:
+            index = self.__decode_cursor(state, cursor)
+            assert index is not None, "invalid cursor"
+
+        page_data, next_index = self.__cached_page_from(state, index,
+                                                        page_size)
+
+        return {
+            'cursor': cursor,
+            'next_cursor': (None if next_index is None
+                            else self.__encode_cursor(state, next_index)),
+            'page_size': len(page_data),
+            'data': page_data
+        }
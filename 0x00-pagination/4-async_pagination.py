@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Asynchronous pagination for asyncio applications
+"""
+import asyncio
+import functools
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+IndexServer = __import__('3-hypermedia_del_pagination').Server
+
+# backends whose pages are served from memory without blocking I/O
+IN_MEMORY_BACKENDS = ("list", "columnar")
+
+
+class SharedIndexServer(IndexServer):
+    """Deletion-resilient Server over the rows another Server loaded
+    """
+
+    def __init__(self, rows_server: HyperServer):
+        super().__init__(rows_server.backend)
+        self.rows_server = rows_server
+
+    def _load(self) -> Tuple[Sequence[List], Optional[Tuple]]:
+        """Returns the dataset of ``rows_server`` instead of parsing
+        DATA_FILE again
+        """
+        state = self.rows_server.state()
+        return state.dataset, state.mark
+
+
+class AsyncServer:
+    """Async front for the pagination Servers.
+
+    Parsing and index builds run in an executor, and concurrent first
+    callers await the same load instead of each starting one; the
+    deletion-resilient pages share the rows of the hypermedia ones.
+    Unfiltered pages of in-memory backends are then sliced on the
+    event loop; pages of disk backends, and filtered or sorted pages,
+    which may scan the dataset, are read in the executor.
+    """
+    DATA_FILE = "Popular_Baby_Names.csv"
+
+    def __init__(self, backend: str = "list", executor=None):
+        """
+        Parameters:
+        - backend (str): storage backend, as for the sync Servers.
+        - executor: a concurrent.futures executor for blocking work,
+          or None for the event loop's default one.
+        """
+        self.backend = backend
+        self.executor = executor
+        self._hyper = HyperServer(backend)
+        self._indexed = SharedIndexServer(self._hyper)
+        self._loads: Dict[str, asyncio.Future] = {}
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Runs a blocking call in the executor
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args))
+
+    async def _run_page(self, func: Callable, *args,
+                        scans: bool = False) -> Any:
+        """
+        Runs a page read inline or in the executor: inline only for an
+        in-memory backend and a read that does not scan (``scans`` is
+        set for filtered or sorted reads, whose counts and lookups can
+        walk the whole dataset).
+        """
+        if self.backend in IN_MEMORY_BACKENDS and not scans:
+            return func(*args)
+        return await self._run(func, *args)
+
+    async def _load(self, name: str, func: Callable) -> Any:
+        """
+        Runs ``func`` in the executor once; callers arriving while it
+        runs await the same result. A failed load is retried by the
+        next caller.
+        """
+        load = self._loads.get(name)
+        if load is None:
+            self._hyper.DATA_FILE = self._indexed.DATA_FILE = self.DATA_FILE
+            load = asyncio.ensure_future(self._run(func))
+            self._loads[name] = load
+
+            def forget_failure(done: asyncio.Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    self._loads.pop(name, None)
+            load.add_done_callback(forget_failure)
+
+        # a cancelled caller must not cancel the load the others share
+        return await asyncio.shield(load)
+
+    async def dataset(self):
+        """Cached dataset, loaded off the event loop
+        """
+        return await self._load("dataset", self._hyper.dataset)
+
+    async def get_page(self, page: int = 1, page_size: int = 10,
+                       filters: Optional[Dict[str, Any]] = None,
+                       sort: Optional[str] = None) -> List[List]:
+        """
+        Retrieves a page of data from the dataset.
+        """
+        await self.dataset()
+        if filters or sort:
+            await self._load("secondary_index", self._hyper.secondary_index)
+        return await self._run_page(
+            self._hyper.get_page, page, page_size, filters, sort,
+            scans=bool(filters or sort))
+
+    async def get_hyper(self, page: int = 1, page_size: int = 10,
+                        filters: Optional[Dict[str, Any]] = None,
+                        sort: Optional[str] = None,
+                        estimate: bool = False) -> Dict[str, Any]:
+        """
+        Returns paginated data with hypermedia metadata.
+        """
+        await self.dataset()
+        if filters or sort:
+            await self._load("secondary_index", self._hyper.secondary_index)
+        return await self._run_page(
+            self._hyper.get_hyper, page, page_size, filters, sort, estimate,
+            scans=bool(filters or sort))
+
+    async def get_hyper_index(self, index: int = None,
+                              page_size: int = 10) -> Dict:
+        """
+        Return a dictionary with deletion-resilient pagination data.
+        """
+        # load the shared rows first, so they are parsed only once
+        await self.dataset()
+        await self._load("indexed_dataset", self._indexed.indexed_dataset)
+        return await self._run_page(
+            self._indexed.get_hyper_index, index, page_size)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Pagination across several CSV files
+"""
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from dataset_backends import (RowSequence, load_block_index,
+                              load_row_offsets, open_dataset,
+                              refresh_dataset)
+
+Server = __import__('2-hypermedia_pagination').Server
+
+# backends whose index lives in a sidecar file the parent can map
+SIDECAR_BACKENDS = {
+    "index": load_row_offsets,
+    "mmap": load_row_offsets,
+    "gzip": load_block_index,
+}
+
+
+class ShardedDataset(RowSequence):
+    """Several datasets presented as one, in the order given.
+
+    Prefix sums of the shard row counts map a row position to its shard
+    with one bisection, so a page costs O(log shards) plus the reads of
+    the one or two shards it spans.
+    """
+
+    def __init__(self, parts: List[Sequence], paths: List[str],
+                 marks: List[Optional[Tuple]]):
+        """
+        Parameters:
+        - parts (list): the shard datasets.
+        - paths (list): the file of each shard.
+        - marks (list): for shards held as lists of rows, the mark their
+          rows were read up to, as ``DatasetServer._load`` returns it.
+        """
+        self.parts = parts
+        self.paths = paths
+        self.marks = marks
+        self.starts = array('Q', [0])
+        for part in parts:
+            self.starts.append(self.starts[-1] + len(part))
+
+    def __len__(self) -> int:
+        return self.starts[-1]
+
+    def shard_of(self, position: int) -> int:
+        """Returns the index of the shard holding row ``position``
+        """
+        return bisect_right(self.starts, position) - 1
+
+    def _rows(self, start: int, end: int) -> List[List]:
+        rows: List[List] = []
+        shard = self.shard_of(start) if start < end else len(self.parts)
+        while start < end:
+            offset = self.starts[shard]
+            stop = min(end, self.starts[shard + 1])
+            rows.extend(self.parts[shard][start - offset:stop - offset])
+            start = stop
+            shard += 1
+        return rows
+
+    def extended(self) -> Optional["ShardedDataset"]:
+        """
+        Returns a new dataset with rows appended to any shard, ``self``
+        when nothing changed, or None if a shard was rewritten.
+        """
+        parts, marks = [], []
+        for part, path, mark in zip(self.parts, self.paths, self.marks):
+            refreshed = refresh_dataset(path, part, mark)
+            if refreshed is None:
+                return None
+            parts.append(refreshed[0])
+            marks.append(refreshed[1])
+        if all(new is old for new, old in zip(parts, self.parts)):
+            return self
+        return ShardedDataset(parts, self.paths, marks)
+
+
+def _load_shard(path: str,
+                backend: str) -> Tuple[Optional[Sequence], Optional[Tuple]]:
+    """
+    Loads one shard; runs in a worker process when loading in parallel.
+    Offset backends only build the shard's sidecar index there, which
+    the parent then maps instead of receiving the offsets by pickle.
+    """
+    if backend in SIDECAR_BACKENDS:
+        SIDECAR_BACKENDS[backend](path)
+        return None, None
+    server = Server(backend)
+    server.DATA_FILE = path
+    return server._load()
+
+
+class ShardedServer(Server):
+    """Paginates many CSV files as one logical dataset of baby names.
+
+    Everything the hypermedia Server offers (filters, batches, read-ahead,
+    reload) works across shards; rows keep the order of ``data_files``.
+    """
+
+    def __init__(self, data_files: List[str], backend: str = "index",
+                 processes: int = 0, **kwargs):
+        """
+        Parameters:
+        - data_files (list): the CSV shards, in row order.
+        - backend (str): storage backend used for every shard.
+        - processes (int): when above 1, load and index the shards in a
+          pool of that many worker processes.
+        - kwargs: passed on to the hypermedia Server.
+        """
+        super().__init__(backend, **kwargs)
+        self.data_files = list(data_files)
+        self.processes = processes
+
+    def _load(self) -> Tuple[ShardedDataset, None]:
+        """Loads every shard, in parallel when processes > 1
+        """
+        backends = [self.backend] * len(self.data_files)
+        if self.processes > 1 and len(self.data_files) > 1:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                loaded = list(pool.map(_load_shard, self.data_files,
+                                       backends))
+        else:
+            loaded = list(map(_load_shard, self.data_files, backends))
+
+        parts, marks = [], []
+        for path, (part, mark) in zip(self.data_files, loaded):
+            if part is None:
+                part = open_dataset(path, self.backend)
+            parts.append(part)
+            marks.append(mark)
+        return ShardedDataset(parts, self.data_files, marks), None
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the pagination Server storage backends.
+
+Usage: ./bench_pagination.py [rows] [csv_file]
+
+Each backend is measured in a fresh process so that its peak RSS is not
+polluted by the others.
+"""
+import asyncio
+import csv
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from array import array
+from typing import Dict, List
+
+Server = __import__('2-hypermedia_pagination').Server
+AsyncServer = __import__('4-async_pagination').AsyncServer
+helper = __import__('0-simple_helper_function')
+
+HEADER = ["Year of Birth", "Gender", "Ethnicity",
+          "Child's First Name", "Count", "Rank"]
+ETHNICITIES = ["ASIAN AND PACIFIC ISLANDER", "BLACK NON HISPANIC",
+               "HISPANIC", "WHITE NON HISPANIC"]
+NAMES = ["Olivia", "Chloe", "Sophia", "Emma", "Mia", "Isabella",
+         "Liam", "Noah", "Ethan", "Jayden", "Aiden", "Matthew"]
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes a baby-names shaped CSV with ``rows`` data rows.
+    """
+    rand = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(HEADER)
+        for _ in range(rows):
+            writer.writerow([
+                rand.randint(2011, 2016),
+                rand.choice(("FEMALE", "MALE")),
+                rand.choice(ETHNICITIES),
+                rand.choice(NAMES),
+                rand.randint(10, 300),
+                rand.randint(1, 100),
+            ])
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Returns the pct-th percentile of an unsorted list of samples
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure_backend(path: str, backend: str, requests: int = 2000,
+                    page_size: int = 100) -> Dict[str, float]:
+    """
+    Loads ``path`` with one backend and times random ``get_page`` calls.
+    """
+    server = Server(backend=backend)
+    server.DATA_FILE = path
+
+    start = time.perf_counter()
+    total_pages = max(1, len(server.dataset()) // page_size)
+    load_time = time.perf_counter() - start
+
+    rand = random.Random(1)
+    latencies = []
+    for _ in range(requests):
+        page = rand.randint(1, total_pages)
+        start = time.perf_counter()
+        server.get_page(page, page_size)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_s": load_time,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _run(args):
+    """Pool entry point; unpacks the measure_backend arguments
+    """
+    return measure_backend(*args)
+
+
+def compare_backends(path: str, backends: List[str]) -> List[Dict]:
+    """
+    Measures every backend in its own freshly spawned process.
+    """
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    for backend in backends:
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            results.append(pool.apply(_run, ((path, backend),)))
+    return results
+
+
+def bench_async(path: str, backend: str, clients: int = 200,
+                requests: int = 20, page_size: int = 100) -> Dict:
+    """
+    Starts ``clients`` concurrent coroutines against one cold AsyncServer,
+    each issuing ``requests`` random ``get_page`` calls.
+    """
+    async def run() -> Dict:
+        server = AsyncServer(backend=backend)
+        server.DATA_FILE = path
+        total_pages = [1]
+        latencies: List[float] = []
+        firsts: List[float] = []
+
+        async def client(seed: int) -> None:
+            rand = random.Random(seed)
+            for i in range(requests):
+                page = rand.randint(1, total_pages[0])
+                start = time.perf_counter()
+                await server.get_page(page, page_size)
+                (firsts if i == 0 else latencies).append(
+                    time.perf_counter() - start)
+                if i == 0:
+                    dataset = await server.dataset()
+                    total_pages[0] = max(1, len(dataset) // page_size)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(seed) for seed in range(clients)))
+        elapsed = time.perf_counter() - start
+        return {
+            "backend": backend,
+            "clients": clients,
+            "first_page_max_s": max(firsts),
+            "req_per_s": clients * requests / elapsed,
+            "p99_ms": percentile(latencies or firsts, 99) * 1000,
+        }
+
+    return asyncio.run(run())
+
+
+def bench_index_ranges(n: int = 1000000) -> Dict[str, float]:
+    """
+    Times ``n`` (page, page_size) offset computations with the scalar
+    ``index_range`` loop and with ``index_ranges``.
+    """
+    rand = random.Random(2)
+    pages = array('q', (rand.randint(1, 10000) for _ in range(n)))
+    sizes = array('q', (rand.randint(1, 100) for _ in range(n)))
+
+    start = time.perf_counter()
+    starts, ends = [], []
+    for page, size in zip(pages, sizes):
+        assert isinstance(page, int) and page > 0
+        assert isinstance(size, int) and size > 0
+        first, last = helper.index_range(page, size)
+        starts.append(first)
+        ends.append(last)
+    results = {"n": n, "scalar_s": time.perf_counter() - start}
+
+    start = time.perf_counter()
+    helper.index_ranges(pages, sizes)
+    results["vector_s"] = time.perf_counter() - start
+
+    if helper.np is not None:
+        np_pages, np_sizes = helper.np.asarray(pages), helper.np.asarray(sizes)
+        start = time.perf_counter()
+        helper.index_ranges(np_pages, np_sizes)
+        results["numpy_s"] = time.perf_counter() - start
+    return results
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    path = sys.argv[2] if len(sys.argv) > 2 else "bench_baby_names.csv"
+    if not os.path.exists(path):
+        write_synthetic_csv(path, rows)
+
+    print("{:<8} {:>9} {:>9} {:>9} {:>12}".format(
+        "backend", "load_s", "p50_ms", "p99_ms", "max_rss_kb"))
+    for res in compare_backends(path, ["list", "index", "mmap", "columnar"]):
+        print("{backend:<8} {load_s:>9.3f} {p50_ms:>9.3f} {p99_ms:>9.3f} "
+              "{max_rss_kb:>12}".format(**res))
+
+    print()
+    print("{:<8} {:>7} {:>16} {:>10} {:>9}".format(
+        "backend", "clients", "first_page_max_s", "req_per_s", "p99_ms"))
+    for backend in ["list", "index", "mmap", "columnar"]:
+        res = bench_async(path, backend)
+        print("{backend:<8} {clients:>7} {first_page_max_s:>16.3f} "
+              "{req_per_s:>10.0f} {p99_ms:>9.3f}".format(**res))
+
+    print()
+    res = bench_index_ranges()
+    print("index_range x{}: ".format(res.pop("n")) + ", ".join(
+        "{}={:.3f}".format(k, v) for k, v in res.items()))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Reproducible pagination benchmark suite.
+
+Usage: ./bench_suite.py [--sizes 10000,1000000] [--backends list,index]
+                        [--output results.json]
+
+For every (dataset size, backend) pair a synthetic baby-names CSV is
+generated once (and reused from --data-dir afterwards), then a fresh
+process measures cold-load time, peak RSS and p50/p99 latencies of
+get_page, get_hyper and get_hyper_index under sequential, random and
+deep-page access, plus get_hyper_index with deletes mixed in; both
+Servers share one copy of the rows. Results are written as JSON so
+runs can be compared between releases.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from typing import Callable, Dict, List
+
+from bench_pagination import percentile, write_synthetic_csv
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+SharedIndexServer = __import__('4-async_pagination').SharedIndexServer
+
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_BACKENDS = "list,index,mmap,columnar"
+PATTERNS = ("sequential", "random", "deep")
+
+
+def dataset_path(data_dir: str, rows: int, seed: int) -> str:
+    """Returns the synthetic CSV for ``rows``, generating it if needed
+    """
+    path = os.path.join(data_dir, "bench_{}_{}.csv".format(rows, seed))
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        write_synthetic_csv(tmp_path, rows, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _latencies(call: Callable[[int], object], args: List[int]) -> Dict:
+    """Times ``call`` once per argument and summarises the latencies
+    """
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        call(arg)
+        samples.append(time.perf_counter() - start)
+    return {
+        "requests": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def _pages(pattern: str, total_pages: int, requests: int,
+           rand: random.Random) -> List[int]:
+    """Returns the page numbers an access pattern visits
+    """
+    if pattern == "sequential":
+        return [1 + i % total_pages for i in range(requests)]
+    if pattern == "random":
+        return [rand.randint(1, total_pages) for _ in range(requests)]
+    deep = max(1, total_pages - max(1, total_pages // 100))
+    return [rand.randint(deep, total_pages) for _ in range(requests)]
+
+
+def run_case(path: str, rows: int, backend: str, requests: int,
+             page_size: int, seed: int) -> Dict:
+    """
+    Measures one (dataset, backend) pair; meant to run in a fresh process.
+    """
+    rand = random.Random(seed)
+    hyper = HyperServer(backend)
+    # the deletion-resilient pages share the rows, so the peak RSS
+    # counts the dataset once, as a real deployment would hold it
+    indexed = SharedIndexServer(hyper)
+    hyper.DATA_FILE = indexed.DATA_FILE = path
+
+    start = time.perf_counter()
+    size = len(hyper.dataset())
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed.indexed_dataset()
+    index_load_s = time.perf_counter() - start
+
+    total_pages = max(1, -(-size // page_size))
+    result = {
+        "rows": rows,
+        "backend": backend,
+        "page_size": page_size,
+        "load_s": load_s,
+        "indexed_load_s": index_load_s,
+        "latency": {},
+    }
+
+    for pattern in PATTERNS:
+        pages = _pages(pattern, total_pages, requests, rand)
+        result["latency"]["get_page/" + pattern] = _latencies(
+            lambda p: hyper.get_page(p, page_size), pages)
+        result["latency"]["get_hyper/" + pattern] = _latencies(
+            lambda p: hyper.get_hyper(p, page_size), pages)
+
+        if pattern == "sequential":
+            # follow next_index the way a client does
+            state = {"index": 0}
+
+            def follow(_):
+                page = indexed.get_hyper_index(state["index"], page_size)
+                state["index"] = page["next_index"] or 0
+            result["latency"]["get_hyper_index/" + pattern] = _latencies(
+                follow, pages)
+        else:
+            indexes = [min(size - 1, (p - 1) * page_size) for p in pages]
+            result["latency"]["get_hyper_index/" + pattern] = _latencies(
+                lambda i: indexed.get_hyper_index(i, page_size), indexes)
+
+    # every fourth request first deletes a run of rows at its index,
+    # until half of the dataset is gone; positions keep their original
+    # numbering, so every index stays valid
+    rows_view = indexed.indexed_dataset()
+
+    def delete_then_page(i: int) -> None:
+        if rand.random() < 0.25 and len(rows_view) > size // 2:
+            for position in range(i, min(size, i + page_size)):
+                if position in rows_view:
+                    del rows_view[position]
+        indexed.get_hyper_index(i, page_size)
+    indexes = [rand.randrange(size) for _ in range(requests)]
+    result["latency"]["get_hyper_index/deletes"] = _latencies(
+        delete_then_page, indexes)
+
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def _run_case(args):
+    """Pool entry point; unpacks the run_case arguments
+    """
+    return run_case(*args)
+
+
+def main(argv: List[str]) -> None:
+    """Runs the suite and writes the JSON report
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated row counts (up to 50000000)")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "python": sys.version,
+            "platform": platform.platform(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "args": vars(args),
+        },
+        "results": [],
+    }
+    ctx = multiprocessing.get_context('spawn')
+    for rows in (int(n) for n in args.sizes.split(",")):
+        path = dataset_path(args.data_dir, rows, args.seed)
+        for backend in args.backends.split(","):
+            with ctx.Pool(1, maxtasksperchild=1) as pool:
+                result = pool.apply(_run_case, ((
+                    path, rows, backend, args.requests, args.page_size,
+                    args.seed),))
+            report["results"].append(result)
+            print("{rows:>10} {backend:<8} load={load_s:.3f}s "
+                  "rss={max_rss_kb}kB".format(**result))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Compresses a CSV dataset for the "gzip" storage backend.
+
+Usage: ./compress_dataset.py [source.csv] [dest.csv.gz] [block_rows]
+
+Defaults to Popular_Baby_Names.csv -> Popular_Baby_Names.csv.gz with
+1024 rows per block. Serve the result with
+``Server(backend="gzip")`` and ``DATA_FILE`` set to the .gz path.
+"""
+import os
+import sys
+
+from dataset_backends import BLOCK_ROWS, write_block_gzip
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "Popular_Baby_Names.csv"
+    dest = sys.argv[2] if len(sys.argv) > 2 else source + ".gz"
+    block_rows = int(sys.argv[3]) if len(sys.argv) > 3 else BLOCK_ROWS
+    count = write_block_gzip(source, dest, block_rows)
+    print("{}: {} rows, {} -> {} bytes".format(
+        dest, count, os.path.getsize(source), os.path.getsize(dest)))
@@ -0,0 +1,776 @@
+#!/usr/bin/env python3
+"""
+Storage backends for the pagination Server.
+
+Every backend behaves like a read-only sequence of rows (lists of str),
+so ``Server.get_page`` can keep using ``len()`` and slicing on whatever
+``Server.dataset()`` returns.
+"""
+import copy
+import csv
+import gzip
+import io
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from abc import abstractmethod
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import (Dict, Iterable, List, Optional, Sequence, Tuple,
+                    Union)
+
+
+def _complete_rows(lines: Iterable[bytes], position: int = 0) -> array:
+    """
+    Finds the complete CSV rows in ``lines``, whose first byte is at
+    file offset ``position``.
+
+    A row is complete once it ends with a newline outside quotes, so a
+    trailing row still being written is left out.
+
+    Returns:
+    - array: An ``array('Q')`` of the start offset of every complete row
+      followed by the offset just past the last of them.
+    """
+    offsets = array('Q')
+    in_quotes = False
+    line = b"\n"
+    for line in lines:
+        # A newline inside a quoted field does not start a new row
+        if not in_quotes:
+            offsets.append(position)
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+        position += len(line)
+    # only the last line can lack its newline
+    if in_quotes or not line.endswith(b"\n"):
+        position = offsets.pop()
+    offsets.append(position)
+    return offsets
+
+
+# bytes before a read position compared to tell an append from a rewrite
+MARK_BYTES = 4096
+
+
+def _mark(f, end: int) -> Tuple[int, int, int]:
+    """
+    Returns the mark of the first ``end`` bytes of the open file ``f``:
+    ``end``, the file's inode and a checksum of the MARK_BYTES before
+    ``end``. Leaves ``f`` positioned at ``end``.
+    """
+    start = max(0, end - MARK_BYTES)
+    f.seek(start)
+    return end, os.fstat(f.fileno()).st_ino, zlib.crc32(f.read(end - start))
+
+
+def read_mark(path: str, end: int) -> Tuple[int, int, int]:
+    """Returns the mark (see ``_mark``) of the first ``end`` bytes of path
+    """
+    with open(path, 'rb') as f:
+        return _mark(f, end)
+
+
+def scan_row_offsets(path: str) -> Tuple[array, int]:
+    """
+    Scans a CSV file once and records the byte offset of every data row.
+
+    Parameters:
+    - path (str): The CSV file to scan. Its first row is the header.
+
+    Returns:
+    - Tuple[array, int]: An ``array('Q')`` holding the start offset of
+      each data row followed by the offset just past the last row, and
+      the number of data rows. A trailing row still being written is
+      left out, to be picked up by ``scan_appended`` once complete.
+    """
+    with open(path, 'rb') as f:
+        offsets = _complete_rows(f)
+
+    # drop the header row
+    if len(offsets) > 1:
+        del offsets[0]
+    return offsets, len(offsets) - 1
+
+
+def read_complete(path: str) -> Tuple[bytes, Tuple[int, int, int]]:
+    """
+    Returns the bytes of a CSV file up to the end of its last complete
+    row, a trailing row still being written left out, and their mark
+    for ``scan_appended``.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        odd_quotes = data.count(b'"', 0, end) % 2
+        while odd_quotes:
+            # that newline is inside a quoted field; try the one before
+            start = data.rfind(b"\n", 0, end - 1) + 1
+            odd_quotes ^= data.count(b'"', start, end) % 2
+            end = start
+        return data[:end], _mark(f, end)
+
+
+def scan_appended(path: str, mark: Tuple[int, int, int]
+                  ) -> Optional[Tuple[array, bytes, Tuple[int, int, int]]]:
+    """
+    Scans the complete rows appended to a CSV file since it was read up
+    to ``mark`` (see ``_mark``).
+
+    Returns:
+    - None when the file was not simply appended to: it shrank, it was
+      replaced by another file, or the bytes before the mark changed.
+    - Otherwise an ``array('Q')`` of the new rows' start offsets followed
+      by the offset just past the last complete row, the bytes of those
+      rows, and the mark of the file up to that offset. A trailing row
+      still being written is left out.
+    """
+    end = mark[0]
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if end == 0 or size < end or _mark(f, end) != mark:
+            return None
+        data = f.read(size - end)
+        offsets = _complete_rows(io.BytesIO(data), end)
+        if len(offsets) > 1:
+            mark = _mark(f, offsets[-1])
+    return offsets, data[:offsets[-1] - end], mark
+
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"PBNIDX01"
+# magic, source size, source mtime_ns, row count
+INDEX_HEADER = struct.Struct("=8sQqQ")
+
+
+def _source_stamp(path: str) -> Tuple[int, int]:
+    """Returns the (size, mtime_ns) pair a sidecar index is keyed on
+    """
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def read_index_file(path: str):
+    """
+    Maps the sidecar index of ``path`` if it matches the current file.
+
+    Returns:
+    - The (offsets, row count) pair, with offsets a memoryview over the
+      mapped sidecar, or None when the sidecar is missing or stale.
+    """
+    try:
+        with open(path + INDEX_SUFFIX, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < INDEX_HEADER.size:
+        return None
+    magic, size, mtime_ns, count = INDEX_HEADER.unpack_from(mapped)
+    expected = INDEX_HEADER.size + (count + 1) * array('Q').itemsize
+    if magic != INDEX_MAGIC or len(mapped) != expected:
+        return None
+    if (size, mtime_ns) != _source_stamp(path):
+        return None
+
+    offsets = memoryview(mapped)[INDEX_HEADER.size:].cast('Q')
+    return offsets, count
+
+
+def write_index_file(path: str, offsets: array, count: int,
+                     stamp: Tuple[int, int]) -> None:
+    """
+    Saves row offsets next to ``path`` so later processes can skip the
+    scan. ``stamp`` is the ``_source_stamp`` taken before the offsets
+    were scanned, so rows appended during the scan leave the sidecar
+    stale rather than trusted and short. Failing to write it (e.g. a
+    read-only directory) is not fatal.
+    """
+    size, mtime_ns = stamp
+    tmp_path = "{}{}.{}.tmp".format(path, INDEX_SUFFIX, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, size, mtime_ns, count))
+            f.write(offsets.tobytes())
+        os.replace(tmp_path, path + INDEX_SUFFIX)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_row_offsets(path: str):
+    """
+    Returns the row offsets of ``path``, from its sidecar index when it
+    is fresh, otherwise by scanning the file and refreshing the sidecar.
+    """
+    cached = read_index_file(path)
+    if cached is not None:
+        return cached
+    stamp = _source_stamp(path)
+    offsets, count = scan_row_offsets(path)
+    write_index_file(path, offsets, count, stamp)
+    return offsets, count
+
+
+def parse_rows(data: bytes) -> List[List]:
+    """
+    Parses raw CSV bytes into rows the same way ``csv.reader`` does for
+    a file opened in text mode.
+    """
+    text = io.StringIO(data.decode('utf-8'), newline=None)
+    return [row for row in csv.reader(text)]
+
+
+class RowSequence(Sequence):
+    """Read-only sequence of rows fetched a range at a time.
+
+    Subclasses implement ``__len__`` and ``_rows``; ``rows``, indexing
+    and slicing all go through ``_rows`` with a range clamped to the
+    dataset, so a slice costs one range read.
+    """
+
+    @abstractmethod
+    def _rows(self, start: int, end: int) -> List[List]:
+        """Returns the rows [start, end), with 0 <= start <= end <= len
+        """
+
+    def rows(self, start: int, end: int) -> List[List]:
+        """
+        Returns the rows in the half-open range [start, end).
+        """
+        start = max(0, min(start, len(self)))
+        end = max(start, min(end, len(self)))
+        return self._rows(start, end)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self.rows(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return self._rows(index, index + 1)[0]
+
+
+class IndexedCSVDataset(RowSequence):
+    """Rows of a CSV file served on demand from a byte-offset index.
+
+    Only the row start offsets are kept in memory, loaded from a
+    ``.idx`` sidecar when one matches the file; a page is read by seeking
+    to its first row and parsing just the rows it covers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offsets, self._count = load_row_offsets(path)
+        self._mark = read_mark(path, self.end)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def end(self) -> int:
+        """Byte offset just past the last indexed row
+        """
+        return self._offsets[self._count]
+
+    def extended(self) -> Optional["IndexedCSVDataset"]:
+        """
+        Returns a new dataset that also covers rows appended to the file
+        since this one was indexed; only the appended bytes are scanned.
+        Returns ``self`` if nothing was appended and None if the file
+        changed in some other way.
+        """
+        stamp = _source_stamp(self.path)
+        appended = scan_appended(self.path, self._mark)
+        if appended is None:
+            return None
+        tail, _, mark = appended
+        if len(tail) == 1:
+            return self
+
+        offsets = array('Q')
+        offsets.frombytes(self._offsets[:self._count].tobytes())
+        offsets.extend(tail)
+        grown = copy.copy(self)
+        grown._offsets, grown._count = offsets, len(offsets) - 1
+        grown._mark = mark
+        # only a sidecar covering the whole file as stamped is any use
+        if grown.end == stamp[0]:
+            write_index_file(self.path, offsets, grown._count, stamp)
+        return grown
+
+    def _read(self, start: int, end: int) -> bytes:
+        """Returns the raw bytes between two file offsets
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _rows(self, start: int, end: int) -> List[List]:
+        if start == end:
+            return []
+        offsets = self._offsets
+        return parse_rows(self._read(offsets[start], offsets[end]))
+
+
+class MmapCSVDataset(IndexedCSVDataset):
+    """Offset-indexed rows read through a shared memory map.
+
+    Pages are sliced straight out of the mapping, so processes serving
+    the same file share the OS page cache instead of each holding a
+    private copy of the parsed dataset.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._map = None
+
+    def _read(self, start: int, end: int) -> bytes:
+        """Returns the raw bytes between two file offsets
+        """
+        if self._map is None:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[start:end]
+
+    def extended(self) -> Optional["MmapCSVDataset"]:
+        grown = super().extended()
+        if grown is not None and grown is not self:
+            # the old mapping is too short; map again on first read
+            grown._map = None
+        return grown
+
+
+class _DictColumn:
+    """A column stored as small integer codes into interned values
+    """
+
+    def __init__(self, values: List[str], codes: Union[array, memoryview]):
+        self.values = values
+        if isinstance(codes, memoryview):
+            # already narrow; a view over a snapshot file is kept as is
+            self.codes = codes
+            return
+        # narrow the codes to the smallest type the cardinality allows
+        for typecode in ('B', 'H', 'I', 'Q'):
+            if len(values) <= 1 << (8 * array(typecode).itemsize):
+                break
+        self.codes = array(typecode, codes)
+
+    def slice(self, start: int, end: int) -> List[str]:
+        """Returns the column values for rows [start, end)
+        """
+        values = self.values
+        return [values[code] for code in self.codes[start:end]]
+
+    def extended(self, new_values: List[str]) -> "_DictColumn":
+        """Returns a copy of this column with ``new_values`` appended
+        """
+        values = list(self.values)
+        lookup = {value: code for code, value in enumerate(values)}
+        codes = array('Q', self.codes)
+        for value in new_values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[sys.intern(value)] = len(values)
+                values.append(value)
+            codes.append(code)
+        return _DictColumn(values, codes)
+
+
+class _IntColumn:
+    """A column of canonical integers packed into an array
+    """
+
+    def __init__(self, ints: array):
+        self.ints = ints
+
+    def slice(self, start: int, end: int) -> List[str]:
+        """Returns the column values for rows [start, end)
+        """
+        return [str(value) for value in self.ints[start:end]]
+
+    def extended(self, new_values: List[str]):
+        """
+        Returns a copy of this column with ``new_values`` appended, as a
+        dictionary column if any of them is not a canonical integer.
+        """
+        if all(_is_canonical_int(value) for value in new_values):
+            ints = array('q', self.ints)
+            ints.extend(int(value) for value in new_values)
+            return _IntColumn(ints)
+        old_values = [str(value) for value in self.ints]
+        return _DictColumn([], array('Q')).extended(old_values + new_values)
+
+
+def _is_canonical_int(value: str) -> bool:
+    """True when ``value`` survives a str -> int -> str round trip
+    """
+    try:
+        return str(int(value)) == value
+    except ValueError:
+        return False
+
+
+class ColumnarDataset(RowSequence):
+    """Rows of a CSV file kept as array-backed columns.
+
+    Columns whose values are all canonical integers (year, count, rank)
+    are packed into ``array('q')``; every other column is dictionary
+    encoded against interned strings. Row lists are only built for the
+    range being read. Rows whose width differs from the header are kept
+    verbatim on the side.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        lookups: List[Dict[str, int]] = []
+        codes: List[array] = []
+        self._irregular: Dict[int, List] = {}
+        count = 0
+
+        data, self._mark = read_complete(path)
+        # bytes loaded, so later appends can be parsed on their own
+        self._end = len(data)
+        reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=None))
+        del data
+        width = self._width = len(next(reader, []))
+        lookups = [{} for _ in range(width)]
+        codes = [array('Q') for _ in range(width)]
+        for row in reader:
+            if len(row) != width:
+                self._irregular[count] = row
+                row = [""] * width
+            for value, lookup, column in zip(row, lookups, codes):
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[sys.intern(value)] = len(lookup)
+                column.append(code)
+            count += 1
+
+        self._count = count
+        self._columns = []
+        for lookup, column in zip(lookups, codes):
+            values = list(lookup)
+            if values and all(_is_canonical_int(v) for v in values):
+                ints = [int(v) for v in values]
+                self._columns.append(
+                    _IntColumn(array('q', (ints[c] for c in column))))
+            else:
+                self._columns.append(_DictColumn(values, column))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def end(self) -> int:
+        """Byte offset just past the last loaded row
+        """
+        return self._end
+
+    def extended(self) -> Optional["ColumnarDataset"]:
+        """
+        Returns a new dataset that also holds rows appended to the file
+        since this one was loaded; only the appended bytes are parsed.
+        Returns ``self`` if nothing was appended and None if the file
+        changed in some other way.
+        """
+        appended = scan_appended(self.path, self._mark)
+        if appended is None:
+            return None
+        tail, data, mark = appended
+        if len(tail) == 1:
+            return self
+
+        grown = copy.copy(self)
+        grown._mark = mark
+        grown._irregular = dict(self._irregular)
+        cells: List[List[str]] = [[] for _ in range(self._width)]
+        for position, row in enumerate(parse_rows(data), self._count):
+            if len(row) != self._width:
+                grown._irregular[position] = row
+                row = [""] * self._width
+            for value, values in zip(row, cells):
+                values.append(value)
+            grown._count = position + 1
+        grown._columns = [column.extended(values)
+                          for column, values in zip(self._columns, cells)]
+        grown._end = tail[-1]
+        return grown
+
+    def _rows(self, start: int, end: int) -> List[List]:
+        if not self._columns:
+            return [self._irregular.get(i, []) for i in range(start, end)]
+
+        columns = [column.slice(start, end) for column in self._columns]
+        page = [list(row) for row in zip(*columns)]
+        if self._irregular:
+            for i in range(start, end):
+                if i in self._irregular:
+                    page[i - start] = list(self._irregular[i])
+        return page
+
+
+BLOCK_ROWS = 1024
+BLOCK_INDEX_MAGIC = b"PBNGZB01"
+
+
+def _row_starts(data: bytes, in_quotes: bool = False,
+                mid_line: bool = False) -> Tuple[int, bool]:
+    """
+    Counts the rows starting in a chunk of CSV bytes.
+
+    ``mid_line`` says the previous chunk stopped part-way through a
+    line, so the first line of this one continues it.
+
+    Returns the count and whether the chunk ends inside a quoted field.
+    """
+    count = 0
+    for line in io.BytesIO(data):
+        if not in_quotes and not mid_line:
+            count += 1
+        mid_line = False
+        if line.count(b'"') % 2:
+            in_quotes = not in_quotes
+    return count, in_quotes
+
+
+def write_block_gzip(source: str, dest: str, block_rows: int = BLOCK_ROWS,
+                     level: int = 6) -> int:
+    """
+    Compresses a CSV file into a seekable multi-member gzip file.
+
+    The header row and then every ``block_rows`` data rows are written
+    as separate gzip members, so any block can be inflated on its own,
+    while ``zcat`` or ``gzip.open`` still read the whole file back. The
+    block index is saved as a sidecar next to ``dest``.
+
+    Returns:
+    - int: the number of data rows written.
+    """
+    assert isinstance(block_rows, int) and block_rows > 0
+    offsets, count = scan_row_offsets(source)
+    tmp_path = "{}.{}.tmp".format(dest, os.getpid())
+    with open(source, 'rb') as src, open(tmp_path, 'wb') as out:
+        header = src.read(offsets[0])
+        out.write(gzip.compress(header, level, mtime=0))
+        for first in range(0, count, block_rows):
+            last = min(first + block_rows, count)
+            data = src.read(offsets[last] - offsets[first])
+            out.write(gzip.compress(data, level, mtime=0))
+        # a last row without a newline still belongs in the copy
+        tail = src.read()
+        if tail:
+            out.write(gzip.compress(tail, level, mtime=0))
+            count += 1
+    os.replace(tmp_path, dest)
+    load_block_index(dest)
+    return count
+
+
+def scan_blocks(path: str) -> Tuple[array, array]:
+    """
+    Finds the gzip members of ``path`` and the rows each one starts.
+
+    Any gzip file works; a member that ends part-way through a row, as
+    bgzip-style members split at arbitrary bytes do, is merged with the
+    next one, so a plain single-member file is one block.
+
+    Returns:
+    - Tuple[array, array]: the compressed offset of every block followed
+      by the file size, and the number of the first row (counting the
+      header as row 0) in every block followed by the total row count.
+    """
+    offsets, starts = array('Q'), array('Q')
+    rows = position = 0
+    in_quotes = False
+    ended_line = True
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+            if size else b""
+    view = memoryview(data)
+    while position < size:
+        if ended_line and not in_quotes:
+            offsets.append(position)
+            starts.append(rows)
+        # inflate one member, feeding it a chunk at a time
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        text = bytearray()
+        while not inflater.eof:
+            chunk = view[position:position + 65536]
+            assert chunk, "truncated gzip member in {}".format(path)
+            text += inflater.decompress(chunk)
+            position += len(chunk)
+        position -= len(inflater.unused_data)
+        count, in_quotes = _row_starts(text, in_quotes, not ended_line)
+        rows += count
+        if text:
+            ended_line = text.endswith(b"\n")
+    view.release()
+    offsets.append(size)
+    starts.append(rows)
+    return offsets, starts
+
+
+def load_block_index(path: str) -> Tuple[array, array]:
+    """
+    Returns the block index of a gzip file, from its sidecar when it is
+    fresh, otherwise by scanning the file and refreshing the sidecar.
+    """
+    size, mtime_ns = _source_stamp(path)
+    try:
+        with open(path + INDEX_SUFFIX, 'rb') as f:
+            raw = f.read()
+        magic, stamp_size, stamp_mtime, blocks = \
+            INDEX_HEADER.unpack_from(raw)
+        if magic == BLOCK_INDEX_MAGIC and \
+                (stamp_size, stamp_mtime) == (size, mtime_ns):
+            both = array('Q')
+            both.frombytes(raw[INDEX_HEADER.size:])
+            if len(both) == 2 * (blocks + 1):
+                return both[:blocks + 1], both[blocks + 1:]
+    except (OSError, struct.error, ValueError):
+        pass
+
+    offsets, starts = scan_blocks(path)
+    tmp_path = "{}{}.{}.tmp".format(path, INDEX_SUFFIX, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(BLOCK_INDEX_MAGIC, size, mtime_ns,
+                                      len(offsets) - 1))
+            f.write(offsets.tobytes())
+            f.write(starts.tobytes())
+        os.replace(tmp_path, path + INDEX_SUFFIX)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return offsets, starts
+
+
+class BlockGzipDataset(RowSequence):
+    """Rows of a block-compressed CSV file (see ``write_block_gzip``).
+
+    Only the block index is kept in memory. A page inflates just the
+    gzip members covering its rows, and the last few inflated blocks
+    are kept so consecutive pages of one block decompress it once.
+    """
+    CACHED_BLOCKS = 8
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = _source_stamp(path)
+        self._offsets, self._starts = load_block_index(path)
+        # the header row is row 0 of the file
+        self._count = max(0, self._starts[-1] - 1)
+        self._blocks: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def end(self) -> int:
+        """Size of the compressed file the index describes
+        """
+        return self._offsets[-1]
+
+    def extended(self) -> Optional["BlockGzipDataset"]:
+        """
+        Returns ``self`` while the file is unchanged, None otherwise;
+        compressed files are reloaded in full when they change.
+        """
+        try:
+            unchanged = _source_stamp(self.path) == self._stamp
+        except OSError:
+            unchanged = False
+        return self if unchanged else None
+
+    def _block(self, block: int) -> List[List]:
+        """Returns the parsed rows of one block, header included
+        """
+        with self._lock:
+            if block in self._blocks:
+                self._blocks.move_to_end(block)
+                return self._blocks[block]
+
+        start, end = self._offsets[block], self._offsets[block + 1]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            rows = parse_rows(gzip.decompress(f.read(end - start)))
+
+        with self._lock:
+            self._blocks[block] = rows
+            while len(self._blocks) > self.CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        return rows
+
+    def _rows(self, start: int, end: int) -> List[List]:
+        # file rows are shifted by one for the header
+        start, end = start + 1, end + 1
+        page: List[List] = []
+        block = bisect_right(self._starts, start) - 1
+        while start < end:
+            first, last = self._starts[block], self._starts[block + 1]
+            rows = self._block(block)
+            page.extend(rows[start - first:min(end, last) - first])
+            start = last
+            block += 1
+        return page
+
+
+BACKENDS = {
+    "index": IndexedCSVDataset,
+    "mmap": MmapCSVDataset,
+    "columnar": ColumnarDataset,
+    "gzip": BlockGzipDataset,
+}
+
+
+def refresh_dataset(path: str, dataset: Sequence, mark: Optional[Tuple]
+                    ) -> Optional[Tuple[Sequence, Optional[Tuple]]]:
+    """
+    Picks up the rows appended to ``path`` since ``dataset`` was loaded.
+
+    Parameters:
+    - dataset: a backend dataset, or the list of rows the "list" Server
+      mode parses.
+    - mark (tuple): for a list, the mark ``read_complete`` returned with
+      its rows; backend datasets keep their own and ignore it.
+
+    Returns:
+    - The extended dataset and its new mark, as a new object so readers
+      still holding ``dataset`` see an unchanged snapshot; the same
+      dataset if nothing was appended; None when the file changed in
+      some other way and must be loaded again from scratch.
+    """
+    if isinstance(dataset, list):
+        appended = scan_appended(path, mark)
+        if appended is None:
+            return None
+        tail, data, mark = appended
+        if len(tail) == 1:
+            return dataset, mark
+        return dataset + parse_rows(data), mark
+
+    grown = dataset.extended()
+    if grown is None:
+        return None
+    return grown, None
+
+
+def open_dataset(path: str, backend: str) -> Sequence:
+    """
+    Opens ``path`` with the named storage backend.
+    """
+    assert backend in BACKENDS, "unknown dataset backend: {}".format(backend)
+    return BACKENDS[backend](path)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Dataset loading and live reload shared by the hypermedia Servers.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dataset_backends import (open_dataset, parse_rows, read_complete,
+                              refresh_dataset)
+from instrumentation import Metrics, timed
+from snapshot import SNAPSHOT_BACKENDS, load_fresh_snapshot, write_snapshot
+
+
+class DatasetState:
+    """One loaded dataset and everything a Server derived from it.
+
+    ``reload()`` never changes a state; it swaps in a new one. A call
+    that reads ``DatasetServer.state()`` once therefore pairs rows with
+    indexes built from those same rows, however reloads interleave.
+    """
+
+    def __init__(self, dataset: Sequence[List], mark: Optional[Tuple],
+                 generation: int):
+        """
+        Parameters:
+        - dataset: the rows.
+        - mark (tuple): for a list of rows, where in DATA_FILE they were
+          read up to (see ``dataset_backends.read_complete``).
+        - generation (int): how many times ``reload()`` had replaced the
+          dataset when this state was made.
+        """
+        self.dataset = dataset
+        self.mark = mark
+        self.generation = generation
+        self.__derived: Dict[str, Any] = {}
+        self.__lock = threading.Lock()
+
+    def derived(self, name: str,
+                build: Callable[[Sequence[List]], Any]) -> Any:
+        """
+        Returns ``build(dataset)``, built on the first call for ``name``
+        and kept with this state; concurrent first callers wait for the
+        one build.
+        """
+        with self.__lock:
+            if name not in self.__derived:
+                self.__derived[name] = build(self.dataset)
+            return self.__derived[name]
+
+    def built(self, name: str) -> Optional[Any]:
+        """Returns what was derived under ``name``, or None if nothing yet
+        """
+        with self.__lock:
+            return self.__derived.get(name)
+
+
+class DatasetServer:
+    """Loads DATA_FILE on first use and picks up rows appended to it.
+
+    Subclasses build their paging API on ``state()``, keep what they
+    derive from the rows with ``DatasetState.derived``, and override
+    ``_dataset_changed`` to carry some of it over when ``reload()``
+    swaps in a new state.
+    """
+    DATA_FILE = "Popular_Baby_Names.csv"
+
+    def __init__(self, backend: str = "list", reload_interval: float = 0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Parameters:
+        - backend (str): storage backend for the rows, as accepted by
+          ``dataset_backends.open_dataset``, or "list" to parse the whole
+          file into memory.
+        - reload_interval (float): when above 0, ``dataset()`` checks
+          DATA_FILE for appended rows at most this often (in seconds)
+          and calls ``reload()``.
+        - metrics (Metrics): records per-method latencies, dataset load
+          and index build times; None turns instrumentation off.
+        """
+        self.backend = backend
+        self.metrics = metrics
+        self.reload_interval = reload_interval
+        self.__state: Optional[DatasetState] = None
+        self.__checked_at = 0.0
+        self.__reload_lock = threading.Lock()
+
+    def state(self) -> DatasetState:
+        """Current dataset and what was derived from it, loaded on first
+        use
+        """
+        if self.__state is not None and self.reload_interval:
+            if time.monotonic() - self.__checked_at >= self.reload_interval:
+                self.reload()
+        state = self.__state
+        if state is None:
+            state = self.__state = DatasetState(*self.__timed_load(), 0)
+            self.__checked_at = time.monotonic()
+        return state
+
+    def dataset(self) -> Sequence[List]:
+        """Cached dataset
+        """
+        return self.state().dataset
+
+    @property
+    def generation(self) -> int:
+        """
+        How many times ``reload()`` has replaced the dataset, so work
+        begun on an older one (e.g. a page being cached) can tell
+        """
+        state = self.__state
+        return 0 if state is None else state.generation
+
+    def _load(self) -> Tuple[Sequence[List], Optional[Tuple]]:
+        """Reads DATA_FILE from scratch with the configured backend
+
+        Returns the dataset and, for a list of rows, the mark of the
+        bytes it was parsed from (see ``dataset_backends.read_complete``),
+        which stop after the last complete row, so ``reload()`` picks up
+        a row that was still being written once it is finished. Backend
+        datasets track that themselves and come with None. A fresh
+        snapshot (see ``save_snapshot``) is used when one exists.
+        Subclasses override this to serve rows from somewhere else.
+        """
+        if self.backend in SNAPSHOT_BACKENDS:
+            snapshot = load_fresh_snapshot(self.DATA_FILE)
+            if snapshot is not None:
+                return snapshot, None
+        if self.backend != "list":
+            return open_dataset(self.DATA_FILE, self.backend), None
+        data, mark = read_complete(self.DATA_FILE)
+        return parse_rows(data)[1:], mark
+
+    def __timed_load(self) -> Tuple[Sequence[List], Optional[Tuple]]:
+        """Calls ``_load``, recording its duration as "dataset_load"
+        """
+        if self.metrics is None:
+            return self._load()
+        start = time.perf_counter()
+        loaded = self._load()
+        self.metrics.observe("dataset_load", time.perf_counter() - start)
+        return loaded
+
+    @timed("reload")
+    def reload(self) -> bool:
+        """
+        Picks up rows appended to DATA_FILE since the dataset was loaded.
+
+        Only the appended bytes are parsed, and the new state is swapped
+        in with a single assignment, so a call already reading the old
+        one finishes on that consistent snapshot. A file that was
+        rewritten rather than appended to is loaded again in full.
+
+        Returns:
+        - bool: True if the dataset changed.
+        """
+        with self.__reload_lock:
+            self.__checked_at = time.monotonic()
+            current = self.__state
+            if current is None:
+                self.state()
+                return True
+
+            refreshed = refresh_dataset(self.DATA_FILE, current.dataset,
+                                        current.mark)
+            appended = refreshed is not None
+            if not appended:
+                refreshed = self.__timed_load()
+            elif refreshed[0] is current.dataset:
+                return False
+            state = DatasetState(*refreshed, current.generation + 1)
+            self._dataset_changed(state, current, appended)
+            self.__state = state
+            return True
+
+    def _dataset_changed(self, state: DatasetState, previous: DatasetState,
+                         appended: bool) -> None:
+        """
+        Called by ``reload()`` just before ``state`` replaces
+        ``previous``; ``appended`` is False when the file was rewritten.
+        """
+
+    def save_snapshot(self) -> str:
+        """
+        Writes a binary snapshot of DATA_FILE, which Servers using the
+        "list" or "columnar" backend then load instead of parsing the
+        CSV, for as long as the file is unchanged.
+
+        Returns:
+        - str: the snapshot path.
+        """
+        return write_snapshot(self.DATA_FILE)
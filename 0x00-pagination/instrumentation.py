@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Low-overhead metrics for the pagination Servers.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# upper bounds, in seconds, of the latency histogram buckets
+BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, as kept for every timed name.
+    """
+
+    def __init__(self):
+        # one slot per bucket plus one for values above the last bound
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Records one duration
+        """
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the upper bound of the bucket holding quantile ``q``,
+        or the largest duration seen for the overflow bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Counters and latency histograms recorded by a Server.
+
+    Pass an instance as ``Server(metrics=...)``; with the default
+    ``metrics=None`` an instrumented call costs one attribute check.
+    Results can be read three ways:
+
+    - ``sink``: a callable invoked as ``sink(kind, name, value)`` on
+      every event, ``kind`` being "counter" or "timing";
+    - ``stats()``: a snapshot dict;
+    - ``prometheus()``: the Prometheus text exposition format.
+    """
+
+    def __init__(self, sink: Optional[Callable[[str, str, float], None]]
+                 = None, prefix: str = "pagination"):
+        self.sink = sink
+        self.prefix = prefix
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Adds ``value`` to counter ``name``
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        if self.sink is not None:
+            self.sink("counter", name, value)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Records a duration in histogram ``name``
+        """
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram()
+            histogram.observe(seconds)
+        if self.sink is not None:
+            self.sink("timing", name, seconds)
+
+    def reset(self) -> None:
+        """Forgets every counter and histogram
+        """
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters and, per timed name, the call count, total
+        and maximum seconds and the bucketed p50/p99.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": {
+                    name: {
+                        "count": h.count,
+                        "sum": h.sum,
+                        "max": h.max,
+                        "p50": h.quantile(0.5),
+                        "p99": h.quantile(0.99),
+                    }
+                    for name, h in self.timings.items()
+                },
+            }
+
+    def prometheus(self) -> str:
+        """Returns every metric in the Prometheus text format
+        """
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = "{}_{}_total".format(self.prefix, name)
+                lines.append("# TYPE {} counter".format(metric))
+                lines.append("{} {}".format(metric, value))
+            for name, h in sorted(self.timings.items()):
+                metric = "{}_{}_seconds".format(self.prefix, name)
+                lines.append("# TYPE {} histogram".format(metric))
+                cumulative = 0
+                for bound, n in zip(BUCKETS, h.buckets):
+                    cumulative += n
+                    lines.append('{}_bucket{{le="{}"}} {}'.format(
+                        metric, bound, cumulative))
+                lines.append('{}_bucket{{le="+Inf"}} {}'.format(
+                    metric, h.count))
+                lines.append("{}_sum {}".format(metric, h.sum))
+                lines.append("{}_count {}".format(metric, h.count))
+        return "\n".join(lines) + "\n"
+
+
+def timed(name: str):
+    """
+    Method decorator recording each call's latency under ``name`` in
+    ``self.metrics``, plus a ``<name>_errors`` count for calls that
+    raise. Does nothing but call through while ``self.metrics`` is None.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            except Exception:
+                metrics.increment(name + "_errors")
+                raise
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
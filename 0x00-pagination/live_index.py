@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Live-row bookkeeping for deletion-resilient pagination.
+"""
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, List, Sequence
+
+
+class LiveIndex:
+    """Set of live row positions backed by a Fenwick (binary indexed) tree.
+
+    Deleting a position, counting the live rows before a position and
+    finding the k-th live row all take O(log n), whatever the size of
+    the deleted ranges around them. Deletes may come from several
+    threads.
+    """
+
+    def __init__(self, size: int, live: bytearray = None):
+        """
+        Parameters:
+        - size (int): number of positions.
+        - live (bytearray): optional 0/1 flag per position; every
+          position is live when omitted.
+        """
+        self.size = size
+        self.top = 1 << size.bit_length() if size else 0
+        # the copy extended() made last, which deletes are passed on to
+        self.successor = None
+        self._lock = threading.Lock()
+        if live is None:
+            self.live = bytearray(b'\x01') * size
+            self.live_count = size
+            # with every position live, node i covers lowbit(i) positions
+            self.tree = array('q', (i & -i for i in range(size + 1)))
+            return
+
+        assert len(live) == size
+        self.live = live
+        self.live_count = sum(live)
+        tree = self.tree = array('q', [0])
+        tree.extend(live)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+
+    def extended(self, size: int) -> "LiveIndex":
+        """
+        Returns a copy grown to ``size`` positions, the new ones live and
+        the deletions so far kept. Positions deleted here later are
+        deleted in the copy as well, so a delete that races the copy is
+        not lost.
+        """
+        assert size >= self.size
+        with self._lock:
+            grown = LiveIndex(size, self.live + b'\x01' * (size - self.size))
+            self.successor = grown
+        return grown
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def __contains__(self, position: int) -> bool:
+        return 0 <= position < self.size and self.live[position] == 1
+
+    def discard(self, position: int) -> bool:
+        """
+        Marks a position as deleted, here and in any copy ``extended``
+        made since.
+
+        Returns:
+        - bool: False if the position was not live in the latest copy.
+        """
+        with self._lock:
+            deleted = position in self
+            if deleted:
+                self.live[position] = 0
+                self.live_count -= 1
+                i = position + 1
+                tree = self.tree
+                while i <= self.size:
+                    tree[i] -= 1
+                    i += i & -i
+            successor = self.successor
+        if successor is not None:
+            return successor.discard(position)
+        return deleted
+
+    def rank(self, position: int) -> int:
+        """Returns the number of live positions before ``position``
+        """
+        total = 0
+        i = min(position, self.size)
+        tree = self.tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def select(self, k: int) -> int:
+        """Returns the position of the k-th (0-based) live row
+        """
+        assert 0 <= k < self.live_count
+        position = 0
+        step = self.top
+        tree = self.tree
+        while step:
+            nxt = position + step
+            if nxt <= self.size and tree[nxt] <= k:
+                position = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return position
+
+    def next_live(self, position: int, count: int) -> List[int]:
+        """
+        Returns up to ``count`` live positions at or after ``position``.
+        """
+        first = self.rank(position)
+        last = min(first + count, self.live_count)
+        return [self.select(k) for k in range(first, last)]
+
+
+class LiveRows(Mapping):
+    """Read/delete view of a dataset keyed by original row position.
+
+    Stands in for the ``{position: row}`` dict the Server used to build:
+    ``del rows[i]`` deletes a row, and only live rows are visible.
+    """
+
+    def __init__(self, dataset: Sequence[List], live: LiveIndex):
+        self.dataset = dataset
+        self.live = live
+
+    def __getitem__(self, position: int) -> List:
+        if position not in self.live:
+            raise KeyError(position)
+        return self.dataset[position]
+
+    def __delitem__(self, position: int) -> None:
+        if not self.live.discard(position):
+            raise KeyError(position)
+
+    def __contains__(self, position) -> bool:
+        return position in self.live
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def __iter__(self) -> Iterator[int]:
+        live = self.live.live
+        return (i for i in range(self.live.size) if live[i])
+
+    def rows_at(self, positions: List[int]) -> List[List]:
+        """
+        Returns the rows at sorted ``positions``, reading each run of
+        consecutive positions with a single slice.
+        """
+        rows: List[List] = []
+        i = 0
+        while i < len(positions):
+            j = i + 1
+            while j < len(positions) and positions[j] == positions[j - 1] + 1:
+                j += 1
+            rows.extend(self.dataset[positions[i]:positions[j - 1] + 1])
+            i = j
+        return rows
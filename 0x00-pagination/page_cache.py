@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Bounded page cache with background read-ahead.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class PageCache:
+    """Thread-safe LRU of served pages that keeps hit statistics.
+
+    Pages stored by read-ahead are tracked until first read, so
+    ``stats()`` shows how many prefetches actually paid off.
+    """
+
+    def __init__(self, capacity: int = 64):
+        assert isinstance(capacity, int) and capacity > 0
+        self.capacity = capacity
+        self._pages: OrderedDict = OrderedDict()
+        self._prefetched = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prefetches = 0
+        self.prefetch_hits = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._pages
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns a cached page, or None on a miss
+        """
+        with self._lock:
+            if key not in self._pages:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if key in self._prefetched:
+                self._prefetched.discard(key)
+                self.prefetch_hits += 1
+            self._pages.move_to_end(key)
+            return self._pages[key]
+
+    def put(self, key: Hashable, page: Any, prefetched: bool = False):
+        """Stores a page, evicting the least recently used one if full
+        """
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            if prefetched:
+                self.prefetches += 1
+                self._prefetched.add(key)
+            while len(self._pages) > self.capacity:
+                old_key, _ = self._pages.popitem(last=False)
+                self._prefetched.discard(old_key)
+
+    def clear(self) -> None:
+        """Drops every cached page; statistics are kept
+        """
+        with self._lock:
+            self._pages.clear()
+            self._prefetched.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the derived hit rates
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._pages),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "prefetches": self.prefetches,
+                "prefetch_hits": self.prefetch_hits,
+                "prefetch_hit_rate": (self.prefetch_hits / self.prefetches
+                                      if self.prefetches else 0.0),
+            }
+
+
+class ReadAhead:
+    """Loads pages into a PageCache on a single background thread.
+    """
+
+    def __init__(self, cache: PageCache):
+        self.cache = cache
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="readahead")
+
+    def schedule(self, key: Hashable, load: Callable[[], Any],
+                 valid: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Queues ``load()`` to fill ``key`` unless it is already cached or
+        queued. Errors while prefetching are dropped; the foreground
+        request will hit them itself. When given, ``valid()`` is checked
+        once the page is loaded, and a page it rejects (say, read from
+        a dataset replaced meanwhile) is not stored.
+        """
+        with self._lock:
+            if key in self._pending or key in self.cache:
+                return
+            self._pending.add(key)
+
+        def run() -> None:
+            try:
+                page = load()
+                if valid is None or valid():
+                    self.cache.put(key, page, prefetched=True)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self._executor.submit(run)
+
+    def shutdown(self) -> None:
+        """Waits for queued prefetches and stops the worker thread
+        """
+        self._executor.shutdown(wait=True)
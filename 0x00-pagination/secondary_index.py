@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes for filtered and sorted pagination.
+"""
+import functools
+import random
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# column positions in Popular_Baby_Names.csv
+COLUMNS = {
+    "year": 0,
+    "gender": 1,
+    "ethnicity": 2,
+    "name": 3,
+    "count": 4,
+    "rank": 5,
+}
+CATEGORICAL = ("year", "gender", "ethnicity")
+FILTERS = CATEGORICAL + ("name_prefix",)
+SORTS = ("count", "rank")
+CHUNK_ROWS = 65536
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _sort_value(value: str) -> Tuple[int, Any]:
+    """Orders numeric cells numerically and anything else after them
+    """
+    try:
+        return 0, int(value)
+    except ValueError:
+        return 1, value
+
+
+def _synchronized(method):
+    """Runs ``method`` while holding the instance lock
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _cell(row: List, column: str) -> str:
+    """Returns a cell by column name, or "" for a short row
+    """
+    i = COLUMNS[column]
+    return row[i] if i < len(row) else ""
+
+
+class SecondaryIndex:
+    """Indexes built once over a dataset to answer filtered pages.
+
+    - per categorical column (year, gender, ethnicity), a value code for
+      every row and one ascending posting list of positions per value;
+    - the case-folded first names, and the positions ordered by them for
+      ``name_prefix`` range lookups by bisection;
+    - per sort key, the integer cells packed in an ``array('q')`` and
+      the few cells that are not 64-bit integers by position, from which
+      a sorted permutation of row positions is built on first use for
+      each direction.
+
+    Resolved queries are kept in a small LRU so paging deeper into the
+    same query only slices an array; shallow pages scan a query only as
+    far as they need, and a later page resumes that scan where it
+    stopped. Match counts are cached per filter set. ``discard`` hides
+    a row from every view and updates the cached counts it affects.
+    Public methods may be called from several threads.
+    """
+    MAX_QUERIES = 128
+    MAX_COUNTS = 4096
+    # pages ending within this many matches of an unresolved query are
+    # found by a lazy scan instead of resolving the whole query
+    LAZY_SCAN_ROWS = 10000
+    # positions tested per step of a lazy scan
+    SCAN_CHUNK = 4096
+    SAMPLE_SIZE = 4096
+
+    def __init__(self, dataset: Sequence[List]):
+        self.size = len(dataset)
+        self.codes: Dict[str, Dict[str, int]] = {c: {} for c in CATEGORICAL}
+        self.row_codes: Dict[str, array] = {
+            c: array('H') for c in CATEGORICAL
+        }
+        self.postings: Dict[str, Dict[str, array]] = {
+            c: {} for c in CATEGORICAL
+        }
+        self.names: List[str] = []
+        sort_keys: Dict[str, Tuple[array, Dict[int, Tuple]]] = {
+            key: (array('q'), {}) for key in SORTS
+        }
+
+        for chunk_start in range(0, self.size, CHUNK_ROWS):
+            chunk = dataset[chunk_start:chunk_start + CHUNK_ROWS]
+            for position, row in enumerate(chunk, chunk_start):
+                for column in CATEGORICAL:
+                    value = _cell(row, column)
+                    codes = self.codes[column]
+                    if value not in codes:
+                        codes[value] = len(codes)
+                        self.postings[column][value] = array('Q')
+                    self.postings[column][value].append(position)
+                    self.row_codes[column].append(codes[value])
+                self.names.append(_cell(row, "name").casefold())
+                for key in SORTS:
+                    ints, others = sort_keys[key]
+                    value = _sort_value(_cell(row, key))
+                    if value[0] == 0 and INT64_MIN <= value[1] <= INT64_MAX:
+                        ints.append(value[1])
+                    else:
+                        ints.append(0)
+                        others[position] = value
+
+        self.name_order = array('Q', sorted(range(self.size),
+                                            key=self.names.__getitem__))
+        self.sorted_names = [self.names[p] for p in self.name_order]
+        self._sort_keys = sort_keys
+        self._permutations: Dict[str, array] = {}
+        self._queries: OrderedDict = OrderedDict()
+        # (positions scanned, matches so far) of partly scanned queries
+        self._scans: OrderedDict = OrderedDict()
+        self._counts: OrderedDict = OrderedDict()
+        self.deleted = bytearray(self.size)
+        self.deleted_count = 0
+        self._lock = threading.RLock()
+        self.sample = array('Q', sorted(random.Random(0).sample(
+            range(self.size), min(self.size, self.SAMPLE_SIZE))))
+
+    @_synchronized
+    def permutation(self, sort: str) -> array:
+        """
+        Returns every row position ordered by ``sort`` ("count", "rank",
+        or either prefixed with "-" for descending). Cells that are not
+        integers order after the integers, as strings. Ties keep file
+        order.
+        """
+        if sort not in self._permutations:
+            ints, others = self._sort_keys[sort.lstrip("-")]
+            key = ints.__getitem__
+            if others:
+                def key(p):
+                    return others[p] if p in others else (0, ints[p])
+            self._permutations[sort] = array('Q', sorted(
+                range(self.size), key=key, reverse=sort.startswith("-")))
+        return self._permutations[sort]
+
+    def _name_prefix(self, prefix: str) -> array:
+        """Returns the ascending positions whose name starts with prefix
+        """
+        prefix = prefix.casefold()
+        lo = bisect_left(self.sorted_names, prefix)
+        hi = bisect_left(self.sorted_names, prefix + "\U0010ffff", lo)
+        return array('Q', sorted(self.name_order[lo:hi]))
+
+    @staticmethod
+    def _key(filters: Dict[str, Any]) -> Tuple:
+        """Returns a hashable, order-independent form of ``filters``
+        """
+        assert all(column in FILTERS for column in filters)
+        return tuple(sorted((k, str(v)) for k, v in filters.items()))
+
+    def _row_matches(self, position: int, key: Tuple) -> bool:
+        """True when the row at ``position`` satisfies ``key``
+        """
+        for column, value in key:
+            if column == "name_prefix":
+                if not self.names[position].startswith(value.casefold()):
+                    return False
+            elif self.row_codes[column][position] != \
+                    self.codes[column].get(value):
+                return False
+        return True
+
+    def _predicate(self, key: Tuple) -> Callable[[int], bool]:
+        """Returns a test for whether a position is live and matches key
+        """
+        deleted = self.deleted
+        return lambda p: not deleted[p] and self._row_matches(p, key)
+
+    def _candidates(self, key: Tuple) -> Sequence[int]:
+        """Returns the smallest ascending position list covering ``key``
+        """
+        if not key:
+            return range(self.size)
+        lists = []
+        for column, value in key:
+            if column == "name_prefix":
+                lists.append(self._name_prefix(value))
+            else:
+                lists.append(self.postings[column].get(value, array('Q')))
+        return min(lists, key=len)
+
+    def _source(self, key: Tuple, sort: Optional[str]) -> Sequence[int]:
+        """Returns the positions to scan, in output order, for a query
+        """
+        assert sort is None or sort.lstrip("-") in SORTS
+        if sort is None:
+            return self._candidates(key)
+        return self.permutation(sort)
+
+    @_synchronized
+    def lookup(self, filters: Optional[Dict[str, Any]] = None,
+               sort: Optional[str] = None) -> Sequence[int]:
+        """
+        Returns the row positions of a filtered and sorted view.
+
+        Parameters:
+        - filters (dict): any of "year", "gender", "ethnicity" (exact
+          match) and "name_prefix" (case-insensitive prefix).
+        - sort (str): "count", "rank", "-count" or "-rank"; None keeps
+          file order.
+        """
+        key = self._key(filters or {})
+        source = self._source(key, sort)
+        if not key and not self.deleted_count:
+            return source
+
+        if (key, sort) in self._queries:
+            self._queries.move_to_end((key, sort))
+            return self._queries[(key, sort)]
+        return self._scan(key, sort)
+
+    def _scan(self, key: Tuple, sort: Optional[str],
+              want: Optional[int] = None) -> array:
+        """
+        Scans the source of a query for live matches, resuming where the
+        last scan of it stopped, until it holds ``want`` of them or, when
+        ``want`` is None, the source is exhausted. A finished scan becomes
+        a resolved query.
+
+        Returns:
+        - array: every match found so far, in output order.
+        """
+        scanned, found = self._scans.pop((key, sort), (0, array('Q')))
+        source = self._source(key, sort)
+        matches = self._predicate(key)
+        while scanned < len(source) and (want is None or len(found) < want):
+            chunk = source[scanned:scanned + self.SCAN_CHUNK]
+            found.extend(p for p in chunk if matches(p))
+            scanned += len(chunk)
+
+        if scanned < len(source):
+            self._scans[(key, sort)] = (scanned, found)
+            if len(self._scans) > self.MAX_QUERIES:
+                self._scans.popitem(last=False)
+            return found
+        self._queries[(key, sort)] = found
+        if len(self._queries) > self.MAX_QUERIES:
+            self._queries.popitem(last=False)
+        self._remember_count(key, len(found))
+        return found
+
+    @_synchronized
+    def page(self, filters: Optional[Dict[str, Any]], sort: Optional[str],
+             start: int, end: int) -> Sequence[int]:
+        """
+        Returns the positions [start, end) of a filtered and sorted view.
+
+        Shallow pages of a query that is not cached yet are found by
+        scanning only until ``end`` matches, without resolving the rest;
+        the scan is kept, so repeating or following the page resumes it.
+        """
+        key = self._key(filters or {})
+        if (key, sort) in self._queries or end > self.LAZY_SCAN_ROWS:
+            return self.lookup(filters, sort)[start:end]
+        if not key and not self.deleted_count:
+            return self._source(key, sort)[start:end]
+        return self._scan(key, sort, end)[start:end]
+
+    def _remember_count(self, key: Tuple, count: int) -> None:
+        """Caches the number of live rows matching ``key``
+        """
+        self._counts[key] = count
+        self._counts.move_to_end(key)
+        if len(self._counts) > self.MAX_COUNTS:
+            self._counts.popitem(last=False)
+
+    @_synchronized
+    def count(self, filters: Optional[Dict[str, Any]] = None,
+              estimate: bool = False) -> int:
+        """
+        Returns how many live rows match ``filters``.
+
+        Exact counts are cached per filter set. With ``estimate``, an
+        uncached count is extrapolated from a fixed sample of rows
+        instead, unless it can be read off a posting list for free.
+        """
+        key = self._key(filters or {})
+        if not key:
+            return self.size - self.deleted_count
+        if key in self._counts:
+            self._counts.move_to_end(key)
+            return self._counts[key]
+
+        column, value = key[0]
+        if len(key) == 1 and column != "name_prefix" and \
+                not self.deleted_count:
+            count = len(self.postings[column].get(value, ()))
+            self._remember_count(key, count)
+            return count
+
+        matches = self._predicate(key)
+        if estimate:
+            live_sample = [p for p in self.sample if not self.deleted[p]]
+            if not live_sample:
+                return 0
+            hits = sum(1 for p in live_sample if matches(p))
+            live = self.size - self.deleted_count
+            return round(hits * live / len(live_sample))
+
+        count = sum(1 for p in self._candidates(key) if matches(p))
+        self._remember_count(key, count)
+        return count
+
+    @_synchronized
+    def discard(self, position: int) -> bool:
+        """
+        Hides a row from every filtered or sorted view.
+
+        Cached counts of the filter sets the row matched are decremented
+        and the resolved or partly scanned queries containing it are
+        dropped.
+
+        Returns:
+        - bool: False if the row was already discarded.
+        """
+        if self.deleted[position]:
+            return False
+        self.deleted[position] = 1
+        self.deleted_count += 1
+
+        for key in self._counts:
+            if self._row_matches(position, key):
+                self._counts[key] -= 1
+        for queries in (self._queries, self._scans):
+            for query in list(queries):
+                if self._row_matches(position, query[0]):
+                    del queries[query]
+        return True
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Binary columnar snapshots of a CSV dataset, for fast Server cold starts.
+
+Usage: ./snapshot.py [source.csv] [dest.snap]
+
+Defaults to Popular_Baby_Names.csv -> Popular_Baby_Names.csv.snap, the
+path the Servers look for. A snapshot holds the columns of a
+``ColumnarDataset``: integer columns as int64 arrays and the other
+columns as a string dictionary plus fixed-width codes. Loading maps the
+file and only decodes the dictionaries; no CSV is parsed.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+from dataset_backends import (ColumnarDataset, _DictColumn, _IntColumn,
+                              _source_stamp, read_mark)
+
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_MAGIC = b"PBNSNP01"
+# magic, source size, source mtime_ns, source bytes loaded, rows,
+# columns, length of the irregular rows JSON
+SNAPSHOT_HEADER = struct.Struct("=8sQqQQQQ")
+# kind, code typecode, dictionary size, dictionary bytes
+COLUMN_HEADER = struct.Struct("=Bc6xQQ")
+INT_COLUMN, DICT_COLUMN = 0, 1
+# Server backends that load a fresh snapshot instead of parsing the CSV
+SNAPSHOT_BACKENDS = ("list", "columnar")
+
+
+def _padded(data: bytes) -> bytes:
+    """Pads ``data`` to a multiple of 8 bytes so arrays stay aligned
+    """
+    return data + b"\0" * (-len(data) % 8)
+
+
+def write_snapshot(source: str, dest: Optional[str] = None) -> str:
+    """
+    Parses the CSV file ``source`` once and saves it as a snapshot.
+
+    The snapshot records the size and modification time ``source`` had
+    before parsing; it is ignored once the file changes.
+
+    Returns:
+    - str: the snapshot path, ``source`` + ".snap" by default.
+    """
+    dest = dest or source + SNAPSHOT_SUFFIX
+    size, mtime_ns = _source_stamp(source)
+    dataset = ColumnarDataset(source)
+
+    headers, sections = [], []
+    for column in dataset._columns:
+        if isinstance(column, _IntColumn):
+            headers.append(COLUMN_HEADER.pack(INT_COLUMN, b'q', 0, 0))
+            sections.append(array('q', column.ints).tobytes())
+            continue
+        encoded = [value.encode('utf-8') for value in column.values]
+        offsets = array('Q', [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        blob = b"".join(encoded)
+        headers.append(COLUMN_HEADER.pack(
+            DICT_COLUMN, column.codes.typecode.encode('ascii'),
+            len(encoded), len(blob)))
+        sections.extend((offsets.tobytes(), _padded(blob),
+                         _padded(column.codes.tobytes())))
+
+    irregular = json.dumps(dataset._irregular).encode('utf-8')
+    tmp_path = "{}.{}.tmp".format(dest, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, size, mtime_ns, dataset.end, len(dataset),
+            len(headers), len(irregular)))
+        for section in headers + sections:
+            f.write(section)
+        f.write(irregular)
+    os.replace(tmp_path, dest)
+    return dest
+
+
+class SnapshotDataset(ColumnarDataset):
+    """A ColumnarDataset whose columns are views over a mapped snapshot.
+
+    Rows appended to the source CSV later are picked up by ``extended``
+    exactly as for a parsed ColumnarDataset.
+    """
+
+    def __init__(self, path: str, snapshot_path: str):
+        self.path = path
+        with open(snapshot_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        (_, _, _, self._end, self._count, width,
+         irregular_size) = SNAPSHOT_HEADER.unpack_from(view)
+        self._width = width
+        self._mark = read_mark(path, self._end)
+
+        position = SNAPSHOT_HEADER.size
+        headers = []
+        for _ in range(width):
+            headers.append(COLUMN_HEADER.unpack_from(view, position))
+            position += COLUMN_HEADER.size
+
+        count = self._count
+        self._columns = []
+        for kind, typecode, values_count, blob_size in headers:
+            typecode = typecode.decode('ascii')
+            if kind == INT_COLUMN:
+                end = position + count * 8
+                self._columns.append(
+                    _IntColumn(view[position:end].cast('q')))
+                position = end
+                continue
+            end = position + (values_count + 1) * 8
+            offsets = view[position:end].cast('Q')
+            blob = bytes(view[end:end + blob_size])
+            position = end + blob_size + (-blob_size % 8)
+            values = [sys.intern(blob[offsets[i]:offsets[i + 1]]
+                                 .decode('utf-8'))
+                      for i in range(values_count)]
+            itemsize = array(typecode).itemsize
+            end = position + count * itemsize
+            codes = view[position:end].cast(typecode)
+            position = end + (-(count * itemsize) % 8)
+            self._columns.append(_DictColumn(values, codes))
+
+        irregular = json.loads(
+            bytes(view[position:position + irregular_size]) or b"{}")
+        self._irregular = {int(k): row for k, row in irregular.items()}
+
+    def __getstate__(self):
+        """Copies the mapped columns into arrays so the dataset pickles
+        """
+        state = self.__dict__.copy()
+        state.pop("_map", None)
+        columns = []
+        for column in self._columns:
+            if isinstance(column, _IntColumn):
+                column = _IntColumn(array('q', column.ints))
+            else:
+                # memoryview codes from the file, or an array once extended
+                codes = column.codes
+                typecode = getattr(codes, 'typecode', None) or codes.format
+                column = _DictColumn(column.values, array(typecode, codes))
+            columns.append(column)
+        state["_columns"] = columns
+        return state
+
+
+def read_snapshot_header(snapshot_path: str) -> Optional[Tuple]:
+    """Returns the unpacked header of a snapshot, or None if unreadable
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return header if header[0] == SNAPSHOT_MAGIC else None
+
+
+def load_fresh_snapshot(path: str) -> Optional[SnapshotDataset]:
+    """
+    Returns the rows of the CSV file ``path`` from its snapshot, or None
+    if there is no snapshot or the CSV changed since it was written.
+    """
+    snapshot_path = path + SNAPSHOT_SUFFIX
+    header = read_snapshot_header(snapshot_path)
+    if header is None:
+        return None
+    try:
+        if header[1:3] != _source_stamp(path):
+            return None
+    except OSError:
+        return None
+    return SnapshotDataset(path, snapshot_path)
+
+
+if __name__ == "__main__":
+    args: List[str] = sys.argv[1:]
+    source = args[0] if args else "Popular_Baby_Names.csv"
+    dest = write_snapshot(source, args[1] if len(args) > 1 else None)
+    print("{}: {} rows, {} -> {} bytes".format(
+        dest, len(SnapshotDataset(source, dest)),
+        os.path.getsize(source), os.path.getsize(dest)))
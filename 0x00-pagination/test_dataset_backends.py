@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the dataset backends
+
+Usage: python3 -m unittest test_dataset_backends
+"""
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import dataset_backends
+from dataset_backends import BlockGzipDataset, IndexedCSVDataset, parse_rows
+
+
+def sample_csv(rows: int) -> bytes:
+    """Returns a CSV header and ``rows`` rows, some with quoted newlines
+    """
+    lines = [b"Year,Gender,Ethnicity,Name,Count,Rank\n"]
+    for i in range(rows):
+        name = b'"Line\nbreak %d"' % i if i % 97 == 0 else b"Name%d" % i
+        lines.append(b"%d,F,HISPANIC,%s,%d,%d\n"
+                     % (2011 + i % 6, name, i % 300, i % 100))
+    return b"".join(lines)
+
+
+class TestBlockGzipDataset(unittest.TestCase):
+    """Rows read from gzip files must match the parsed CSV
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv.gz")
+        os.close(handle)
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def assert_same_rows(self, data: bytes):
+        """Checks every page of the gzip file against parse_rows
+        """
+        expected = parse_rows(data)[1:]
+        dataset = BlockGzipDataset(self.path)
+        self.assertEqual(len(dataset), len(expected))
+        for start in range(0, len(expected), 34):
+            self.assertEqual(dataset[start:start + 34],
+                             expected[start:start + 34])
+
+    def test_single_member(self):
+        data = sample_csv(3000)
+        with open(self.path, 'wb') as f:
+            f.write(gzip.compress(data))
+        self.assert_same_rows(data)
+
+    def test_members_split_mid_line(self):
+        # bgzip-style members end at arbitrary bytes, inside rows and
+        # inside quoted fields
+        data = sample_csv(3000)
+        with open(self.path, 'wb') as f:
+            for start in range(0, len(data), 5000):
+                f.write(gzip.compress(data[start:start + 5000]))
+        self.assert_same_rows(data)
+
+
+class TestIndexFile(unittest.TestCase):
+    """A sidecar index must never hide rows written while it was built
+    """
+    ROW = b"2016,FEMALE,ASIAN,Ann,10,1\n"
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        with open(self.path, 'wb') as f:
+            f.write(sample_csv(0) + self.ROW)
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def append_after(self, scan):
+        """Wraps a scan function to append a row once it has read
+        """
+        def wrapper(*args):
+            result = scan(*args)
+            with open(self.path, 'ab') as f:
+                f.write(self.ROW)
+            return result
+        return wrapper
+
+    def test_append_during_first_scan(self):
+        with mock.patch.object(
+                dataset_backends, "scan_row_offsets",
+                self.append_after(dataset_backends.scan_row_offsets)):
+            self.assertEqual(len(IndexedCSVDataset(self.path)), 1)
+        self.assertEqual(len(IndexedCSVDataset(self.path)), 2)
+
+    def test_append_during_extend(self):
+        dataset = IndexedCSVDataset(self.path)
+        with open(self.path, 'ab') as f:
+            f.write(self.ROW)
+        with mock.patch.object(
+                dataset_backends, "scan_appended",
+                self.append_after(dataset_backends.scan_appended)):
+            self.assertEqual(len(dataset.extended()), 2)
+        self.assertEqual(len(IndexedCSVDataset(self.path)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
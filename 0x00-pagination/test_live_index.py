@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for deletion-resilient pagination
+
+Usage: python3 -m unittest test_live_index
+"""
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+from live_index import LiveIndex
+
+Server = __import__('3-hypermedia_del_pagination').Server
+
+HEADER = "Year,Gender,Ethnicity,Name,Count,Rank\n"
+BACKENDS = ("list", "index", "columnar")
+
+
+class TestLiveIndex(unittest.TestCase):
+    """LiveIndex must answer like a plain set of live positions
+    """
+
+    def assert_matches(self, index: LiveIndex, live: set):
+        ordered = sorted(live)
+        self.assertEqual(len(index), len(live))
+        for position in range(0, index.size + 1, 7):
+            self.assertEqual(index.rank(position),
+                             sum(1 for p in live if p < position))
+            first = index.rank(position)
+            self.assertEqual(index.next_live(position, 5),
+                             ordered[first:first + 5])
+        for k in range(0, len(ordered), 11):
+            self.assertEqual(index.select(k), ordered[k])
+
+    def test_random_deletes(self):
+        rand = random.Random(0)
+        for size in (0, 1, 2, 100, 257):
+            index, live = LiveIndex(size), set(range(size))
+            for _ in range(3):
+                for position in rand.sample(range(size + 3),
+                                            min(size, 40)):
+                    self.assertEqual(index.discard(position),
+                                     position in live)
+                    live.discard(position)
+                self.assert_matches(index, live)
+            rebuilt = LiveIndex(size, bytearray(index.live))
+            self.assert_matches(rebuilt, live)
+
+    def test_extended(self):
+        index = LiveIndex(50)
+        for position in (0, 7, 49):
+            index.discard(position)
+        grown = index.extended(80)
+        self.assert_matches(grown, set(range(80)) - {0, 7, 49})
+        # deletes through the old index reach the copy too
+        self.assertTrue(index.discard(30))
+        self.assertFalse(grown.discard(30))
+        self.assert_matches(grown, set(range(80)) - {0, 7, 30, 49})
+
+
+class TestIndexedPages(unittest.TestCase):
+    """get_hyper_index and cursor pages must match csv.reader
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.append(range(300), header=True)
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def append(self, numbers, header: bool = False):
+        """Adds a row per number, naming it after the number
+        """
+        with open(self.path, 'w' if header else 'a', newline='') as f:
+            if header:
+                f.write(HEADER)
+            for i in numbers:
+                f.write("2016,FEMALE,ASIAN,Name{},{},1\n".format(i, i % 40))
+
+    def expected(self, deleted):
+        """Returns the (position, row) pairs still live, in file order
+        """
+        with open(self.path, newline='') as f:
+            rows = list(csv.reader(f))[1:]
+        return [(i, row) for i, row in enumerate(rows) if i not in deleted]
+
+    def assert_pages(self, server: Server, deleted: set):
+        """Walks every page both ways and compares it with csv.reader
+        """
+        live = self.expected(deleted)
+        rows = [row for _, row in live]
+
+        seen, index = [], 0
+        while index is not None:
+            page = server.get_hyper_index(index, 13)
+            self.assertLessEqual(page['page_size'], 13)
+            seen.extend(page['data'])
+            index = page['next_index']
+        self.assertEqual(seen, rows)
+
+        seen, cursor = [], None
+        while True:
+            page = server.get_cursor_page(cursor, 13)
+            seen.extend(page['data'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, rows)
+
+        # a page starting at a deleted position begins at the next live
+        # row, however far away
+        for start in (0, 1, 57, 150, 299):
+            after = [row for i, row in live if i >= start]
+            self.assertEqual(server.get_hyper_index(start, 4)['data'],
+                             after[:4])
+
+    def test_deletes(self):
+        rand = random.Random(0)
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                server = Server(backend)
+                server.DATA_FILE = self.path
+                deleted = set()
+                rows = server.indexed_dataset()
+                for position in list(range(40, 120)) + rand.sample(
+                        range(300), 50):
+                    if position not in deleted:
+                        del rows[position]
+                        deleted.add(position)
+                self.assert_pages(server, deleted)
+
+    def test_deletes_then_append(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.append(range(300), header=True)
+                server = Server(backend)
+                server.DATA_FILE = self.path
+                rows = server.indexed_dataset()
+                deleted = set(range(10, 290))
+                for position in deleted:
+                    del rows[position]
+                cursor = server.get_cursor_page(None, 5)['next_cursor']
+
+                self.append(range(300, 340))
+                self.assertTrue(server.reload())
+                self.assert_pages(server, deleted)
+                # cursors issued before the append still resume
+                self.assertEqual(
+                    server.get_cursor_page(cursor, 5)['data'],
+                    [row for _, row in self.expected(deleted)][5:10])
+                del server.indexed_dataset()[320]
+                self.assert_pages(server, deleted | {320})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for picking up changes to DATA_FILE with Server.reload()
+
+Usage: python3 -m unittest test_reload
+"""
+import csv
+import os
+import pickle
+import tempfile
+import unittest
+
+from snapshot import SnapshotDataset
+
+Server = __import__('2-hypermedia_pagination').Server
+ShardedServer = __import__('5-sharded_pagination').ShardedServer
+
+HEADER = "Year,Gender,Ethnicity,Name,Count,Rank\n"
+BACKENDS = ("list", "index", "mmap", "columnar")
+
+
+def csv_rows(path: str):
+    """Returns the data rows of ``path`` as csv.reader sees them
+    """
+    with open(path, newline='') as f:
+        return list(csv.reader(f))[1:]
+
+
+class TestReload(unittest.TestCase):
+    """Pages served after reload() must match the file on disk
+    """
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+
+    def tearDown(self):
+        for path in (self.path, self.path + ".idx", self.path + ".snap"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, names, mode='w', path=None):
+        """
+        Writes one row per name, after the header unless appending;
+        names starting with a vowel are male
+        """
+        with open(path or self.path, mode, newline='') as f:
+            if mode == 'w':
+                f.write(HEADER)
+            for name in names:
+                f.write("2016,{},ASIAN,{},{},1\n".format(
+                    "MALE" if name[0] in "AEIOU" else "FEMALE", name,
+                    len(name)))
+
+    def server(self, backend: str) -> Server:
+        """Returns a Server over the temporary file, already loaded
+        """
+        server = Server(backend)
+        server.DATA_FILE = self.path
+        server.dataset()
+        return server
+
+    def assert_serves_file(self, server: Server):
+        """Checks the whole dataset and its pages against csv.reader
+        """
+        expected = csv_rows(self.path)
+        self.assertEqual(list(server.dataset()[:]), expected)
+        for page in (1, 2, 3):
+            self.assertEqual(server.get_page(page, 2),
+                             expected[(page - 1) * 2:page * 2])
+
+    def test_append(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.write(["Ann", "Bea"])
+                server = self.server(backend)
+                self.write(["Cat"], mode='a')
+                self.assertTrue(server.reload())
+                self.assert_serves_file(server)
+                self.assertFalse(server.reload())
+
+    def test_rewrite_with_more_rows(self):
+        # a new export replacing the file is not an append, even though
+        # it is longer and the old end offset falls after a newline
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.write(["Old1", "Old2"])
+                server = self.server(backend)
+                self.write(["New1", "New2", "New3"])
+                self.assertTrue(server.reload())
+                self.assert_serves_file(server)
+
+    def test_rewrite_same_size(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.write(["Ann", "Bea"])
+                server = self.server(backend)
+                self.write(["Cid", "Dee"])
+                self.assertTrue(server.reload())
+                self.assert_serves_file(server)
+
+    def test_filtered_pages_after_append(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.write(["Ann", "Bea", "Eve", "Cat"])
+                server = self.server(backend)
+                server.get_page(1, 2, {"gender": "MALE"}, "-count")
+                self.write(["Ida", "Dee", "Olga"], mode='a')
+                self.assertTrue(server.reload())
+                rows = csv_rows(self.path)
+                male = [row for row in rows if row[1] == "MALE"]
+                self.assertEqual(server.get_pages([1, 2], 2,
+                                                  {"gender": "MALE"}),
+                                 [male[:2], male[2:4]])
+                self.assertEqual(
+                    server.get_page(1, 10, sort="-count"),
+                    sorted(rows, key=lambda row: -int(row[4])))
+
+    def test_snapshot(self):
+        writer = Server("columnar")
+        writer.DATA_FILE = self.path
+        for backend in ("list", "columnar"):
+            with self.subTest(backend=backend):
+                self.write(["Ann", "Bea", "Cat"])
+                writer.save_snapshot()
+                server = self.server(backend)
+                self.assertIsInstance(server.dataset(), SnapshotDataset)
+                self.assert_serves_file(server)
+
+                self.write(["Dee", "Eve"], mode='a')
+                self.assertTrue(server.reload())
+                self.assert_serves_file(server)
+                copy = pickle.loads(pickle.dumps(server.dataset()))
+                self.assertEqual(copy[:], csv_rows(self.path))
+
+                # a snapshot is ignored once the file was rewritten
+                self.write(["Fay"])
+                self.assertNotIsInstance(self.server(backend).dataset(),
+                                         SnapshotDataset)
+
+
+class TestShardedReload(unittest.TestCase):
+    """Pages across shards must match the shards concatenated
+    """
+
+    def setUp(self):
+        self.paths = []
+        for shard in range(3):
+            handle, path = tempfile.mkstemp(suffix=".csv")
+            os.close(handle)
+            self.paths.append(path)
+
+    def tearDown(self):
+        for path in self.paths:
+            for name in (path, path + ".idx"):
+                if os.path.exists(name):
+                    os.remove(name)
+
+    def write(self, shard: int, count: int, mode='w'):
+        """Writes ``count`` rows named after their shard and number
+        """
+        with open(self.paths[shard], mode, newline='') as f:
+            if mode == 'w':
+                f.write(HEADER)
+            for i in range(count):
+                f.write("2016,FEMALE,ASIAN,S{}R{},10,1\n".format(shard, i))
+
+    def assert_serves_shards(self, server: ShardedServer):
+        expected = sum((csv_rows(path) for path in self.paths), [])
+        self.assertEqual(server.get_pages(range(1, 8), 3),
+                         [expected[i:i + 3] for i in range(0, 21, 3)])
+        self.assertEqual(server.get_page(2, 4, {"year": 2016}),
+                         expected[4:8])
+
+    def test_append_and_rewrite(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                for shard, count in enumerate((5, 0, 4)):
+                    self.write(shard, count)
+                server = ShardedServer(self.paths, backend)
+                self.assert_serves_shards(server)
+
+                self.write(1, 3, mode='a')
+                self.assertTrue(server.reload())
+                self.assert_serves_shards(server)
+
+                self.write(0, 2)
+                self.assertTrue(server.reload())
+                self.assert_serves_shards(server)
+
+
+if __name__ == "__main__":
+    unittest.main()
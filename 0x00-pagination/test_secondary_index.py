@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tests for filtered and sorted pages
+
+Usage: python3 -m unittest test_secondary_index
+"""
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+from secondary_index import COLUMNS, SecondaryIndex
+
+Server = __import__('2-hypermedia_pagination').Server
+
+HEADER = "Year,Gender,Ethnicity,Name,Count,Rank\n"
+BACKENDS = ("list", "index", "columnar")
+FILTERS = (
+    {},
+    {"year": 2012},
+    {"gender": "MALE", "ethnicity": "ASIAN"},
+    {"name_prefix": "an"},
+    {"name_prefix": "AN", "year": "2011"},
+    {"ethnicity": "NONE"},
+)
+SORTS = (None, "count", "-count", "rank", "-rank")
+
+
+def write_sample(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes ``rows`` random rows, a few of them short or with counts
+    that are not integers
+    """
+    rand = random.Random(seed)
+    names = ["Ann", "anna", "Andre", "Bo", "Cy", "Zoe", "Ánh"]
+    with open(path, 'w', newline='') as f:
+        f.write(HEADER)
+        writer = csv.writer(f, lineterminator="\n")
+        for _ in range(rows):
+            row = [str(rand.randint(2011, 2014)),
+                   rand.choice(["FEMALE", "MALE"]),
+                   rand.choice(["ASIAN", "HISPANIC", "WHITE"]),
+                   rand.choice(names),
+                   str(rand.randint(10, 40)),
+                   str(rand.randint(1, 9))]
+            if rand.random() < 0.02:
+                row[4] = rand.choice(["", "n/a", "99999999999999999999"])
+            if rand.random() < 0.02:
+                row = row[:rand.randint(1, 5)]
+            writer.writerow(row)
+
+
+def cell(row, column: str) -> str:
+    """Returns a cell by column name, or "" for a short row
+    """
+    i = COLUMNS[column]
+    return row[i] if i < len(row) else ""
+
+
+def matches(row, filters) -> bool:
+    """True when ``row`` satisfies ``filters``, as documented
+    """
+    for column, value in filters.items():
+        if column == "name_prefix":
+            if not cell(row, "name").casefold().startswith(
+                    value.casefold()):
+                return False
+        elif cell(row, column) != str(value):
+            return False
+    return True
+
+
+def sort_key(column: str):
+    """Orders integer cells numerically, then anything else as strings
+    """
+    def key(row):
+        value = cell(row, column)
+        try:
+            return 0, int(value)
+        except ValueError:
+            return 1, value
+    return key
+
+
+def expected_view(rows, filters, sort):
+    """Returns the rows a filtered and sorted view holds, in order
+    """
+    view = [row for row in rows if matches(row, filters)]
+    if sort is not None:
+        view.sort(key=sort_key(sort.lstrip("-")),
+                  reverse=sort.startswith("-"))
+    return view
+
+
+class TestFilteredPages(unittest.TestCase):
+    """Server pages with filters and sorts must match csv.reader
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        write_sample(cls.path, 700)
+        with open(cls.path, newline='') as f:
+            cls.rows = list(csv.reader(f))[1:]
+
+    @classmethod
+    def tearDownClass(cls):
+        for path in (cls.path, cls.path + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def server(self, backend: str) -> Server:
+        server = Server(backend)
+        server.DATA_FILE = self.path
+        return server
+
+    def test_pages(self):
+        for backend in BACKENDS:
+            server = self.server(backend)
+            for filters in FILTERS:
+                for sort in SORTS:
+                    with self.subTest(backend=backend, filters=filters,
+                                      sort=sort):
+                        view = expected_view(self.rows, filters, sort)
+                        for page in (1, 2, 5, 40):
+                            self.assertEqual(
+                                server.get_page(page, 17, filters, sort),
+                                view[(page - 1) * 17:page * 17])
+                        self.assertEqual(
+                            sum(server.get_pages(range(1, 43), 17,
+                                                 filters, sort), []),
+                            view)
+
+    def test_hypermedia(self):
+        server = self.server("list")
+        for filters in FILTERS[1:]:
+            view = expected_view(self.rows, filters, None)
+            for estimate in (False, True):
+                with self.subTest(filters=filters, estimate=estimate):
+                    # follow next_page to the end
+                    seen, page = [], 1
+                    while page is not None:
+                        hyper = server.get_hyper(page, 25, filters,
+                                                 estimate=estimate)
+                        seen.extend(hyper["data"])
+                        page = hyper["next_page"]
+                    self.assertEqual(seen, view)
+                    if not estimate:
+                        self.assertEqual(hyper["total_pages"],
+                                         -(-len(view) // 25))
+
+    def test_lazy_scans(self):
+        # shallow pages scan only as far as they need and resume there;
+        # small limits make every page below take that path
+        index = SecondaryIndex(self.rows)
+        index.LAZY_SCAN_ROWS = 10 ** 6
+        index.SCAN_CHUNK = 7
+        for filters in FILTERS[1:]:
+            for sort in SORTS:
+                with self.subTest(filters=filters, sort=sort):
+                    view = expected_view(self.rows, filters, sort)
+                    positions = [index.page(filters, sort, start, start + 9)
+                                 for start in (18, 0, 9, 300, 27)]
+                    self.assertEqual(
+                        [[self.rows[p] for p in page] for page in positions],
+                        [view[start:start + 9]
+                         for start in (18, 0, 9, 300, 27)])
+                    self.assertEqual(index.count(filters), len(view))
+
+    def test_discard(self):
+        index = SecondaryIndex(self.rows)
+        index.LAZY_SCAN_ROWS = 100
+        rand = random.Random(1)
+        deleted = set()
+        for round_ in range(4):
+            # cache some counts, queries and partial scans, then delete
+            for filters in FILTERS:
+                index.count(filters)
+                index.page(filters, "rank", 0, 20)
+                index.lookup(filters, "-count")
+            for position in rand.sample(range(len(self.rows)), 60):
+                self.assertEqual(index.discard(position),
+                                 position not in deleted)
+                deleted.add(position)
+            live = [row for i, row in enumerate(self.rows)
+                    if i not in deleted]
+            for filters in FILTERS:
+                for sort in SORTS:
+                    with self.subTest(round=round_, filters=filters,
+                                      sort=sort):
+                        view = expected_view(live, filters, sort)
+                        self.assertEqual(
+                            [self.rows[p]
+                             for p in index.lookup(filters, sort)], view)
+                        self.assertEqual(
+                            [self.rows[p]
+                             for p in index.page(filters, sort, 5, 30)],
+                            view[5:30])
+                        self.assertEqual(index.count(filters), len(view))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,15 +9,34 @@ class BasicCache(BaseCaching):
     """
     BasicCache defines a basic caching system without any limit
     """
-    def put(self, key, item):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
+        """ Initialize the class; only ttl applies to a basic cache """
+        assert max_items is None and max_bytes is None, \
+            "BasicCache has no capacity or byte limit"
+        super().__init__(ttl=ttl)
+
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache
         """
         if key is not None and item is not None:
+            if self.expiry_heap:
+                self.reap()
             self.cache_data[key] = item
+            self.track(key, 0, ttl)
 
     def get(self, key):
         """
         Get an item by key
         """
+        if key is None or (self.expires and self.expired(key)):
+            return None
         return self.cache_data.get(key, None)
+
+    def remove(self, key):
+        """
+        Remove an item
+        """
+        del self.cache_data[key]
+        self.untrack(key)
@@ -2,6 +2,8 @@
 """
 FIFOCache module
 """
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
@@ -9,34 +11,55 @@ class FIFOCache(BaseCaching):
     """
     FIFOCache defines a FIFO caching system
     """
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
         """ Initialize the class """
-        super().__init__()
-        self.order = []
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        # keys in put order; an OrderedDict so removing one is O(1)
+        self.order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache
         """
         if key is not None and item is not None:
+            # Discard first items while the cache is full
+            size = self.make_room(key, item)
+            if size is None:
+                return
             # If key already exists,
             # update the value and do not change order
             if key in self.cache_data:
                 self.cache_data[key] = item
             # If adding a new item
             else:
-                # and the cache exceeds MAX_ITEMS, discard first item
-                if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                    first_key = self.order.pop(0)
-                    del self.cache_data[first_key]
-                    print(f"DISCARD: {first_key}")
-
                 # Add the new item to cache and keep track of its order
                 self.cache_data[key] = item
-                self.order.append(key)
+                self.order[key] = None
+            self.track(key, size, ttl)
+
+    def discard(self, keep=None):
+        """
+        Discard the first item put, other than keep
+        """
+        first_key = next(k for k in self.order if k != keep)
+        del self.order[first_key]
+        del self.cache_data[first_key]
+        self.untrack(first_key)
+        print(f"DISCARD: {first_key}")
+
+    def remove(self, key):
+        """
+        Remove an item without printing DISCARD
+        """
+        del self.cache_data[key]
+        del self.order[key]
+        self.untrack(key)
 
     def get(self, key):
         """
         Get an item by key
         """
+        if key is None or (self.expires and self.expired(key)):
+            return None
         return self.cache_data.get(key, None)
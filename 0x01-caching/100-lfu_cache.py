@@ -8,64 +8,80 @@ from base_caching import BaseCaching
 class LFUCache(BaseCaching):
     """
     LFUCache defines a LFU caching system
+
+    Keys are grouped in one bucket per use count, each an OrderedDict
+    from least to most recently used, and min_freq points at the
+    lowest non-empty bucket. get, put and eviction are all O(1); ties
+    between least frequently used keys go to the least recently used.
     """
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
         """Initializes the cache.
         """
-        super().__init__()
-        self.cache_data = OrderedDict()
-        self.keys_freq = []
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        self.freq = {}
+        self.buckets = {}
+        self.min_freq = 0
 
-    def __reorder_items(self, mru_key):
-        """Reorders the items in this cache based on the most
-        recently used item.
+    def __touch(self, key):
+        """Moves a key to the back of the next frequency bucket.
         """
-        max_positions = []
-        mru_freq = 0
-        mru_pos = 0
-        ins_pos = 0
-        for i, key_freq in enumerate(self.keys_freq):
-            if key_freq[0] == mru_key:
-                mru_freq = key_freq[1] + 1
-                mru_pos = i
-                break
-            elif len(max_positions) == 0:
-                max_positions.append(i)
-            elif key_freq[1] < self.keys_freq[max_positions[-1]][1]:
-                max_positions.append(i)
-        max_positions.reverse()
-        for pos in max_positions:
-            if self.keys_freq[pos][1] > mru_freq:
-                break
-            ins_pos = pos
-        self.keys_freq.pop(mru_pos)
-        self.keys_freq.insert(ins_pos, [mru_key, mru_freq])
+        freq = self.freq[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freq[key] = freq + 1
+        self.buckets.setdefault(freq + 1, OrderedDict())[key] = None
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """Adds an item in the cache.
         """
         if key is None or item is None:
             return
-        if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                lfu_key, _ = self.keys_freq[-1]
-                self.cache_data.pop(lfu_key)
-                self.keys_freq.pop()
-                print("DISCARD:", lfu_key)
+        size = self.make_room(key, item)
+        if size is None:
+            return
+        if key in self.cache_data:
             self.cache_data[key] = item
-            ins_index = len(self.keys_freq)
-            for i, key_freq in enumerate(self.keys_freq):
-                if key_freq[1] == 0:
-                    ins_index = i
-                    break
-            self.keys_freq.insert(ins_index, [key, 0])
+            self.__touch(key)
         else:
             self.cache_data[key] = item
-            self.__reorder_items(key)
+            self.freq[key] = 1
+            self.buckets.setdefault(1, OrderedDict())[key] = None
+            self.min_freq = 1
+        self.track(key, size, ttl)
+
+    def discard(self, keep=None):
+        """Discards the least frequently used item, other than keep.
+        """
+        if self.min_freq not in self.buckets:
+            # an earlier discard emptied the lowest bucket
+            self.min_freq = min(self.buckets)
+        lfu_key = next(iter(self.buckets[self.min_freq]))
+        if lfu_key == keep:
+            lfu_key = next(k for freq in sorted(self.buckets)
+                           for k in self.buckets[freq] if k != keep)
+        self.remove(lfu_key)
+        print("DISCARD:", lfu_key)
+
+    def remove(self, key):
+        """Removes an item without printing DISCARD.
+        """
+        freq = self.freq.pop(key)
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+        del self.cache_data[key]
+        self.untrack(key)
 
     def get(self, key):
         """Retrieves an item by key.
         """
-        if key is not None and key in self.cache_data:
-            self.__reorder_items(key)
+        if key is not None and key in self.cache_data and \
+                not (self.expires and self.expired(key)):
+            self.__touch(key)
         return self.cache_data.get(key, None)
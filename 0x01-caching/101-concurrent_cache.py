@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Thread-safe caching systems
+"""
+import threading
+
+from base_caching import BaseCaching
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+def locked(cache_class):
+    """
+    Returns a subclass of ``cache_class`` whose put, get and print_cache
+    hold a per-instance lock, e.g. ``locked(LRUCache)()``.
+    """
+    class LockedCache(cache_class):
+        """
+        Thread-safe {} guarded by a single lock
+        """
+        thread_safe = True
+
+        def __init__(self, *args, **kwargs):
+            """ Initialize the class """
+            self.lock = threading.RLock()
+            super().__init__(*args, **kwargs)
+
+        def put(self, key, item, ttl=None):
+            """ Add an item in the cache """
+            with self.lock:
+                super().put(key, item, ttl)
+
+        def get(self, key):
+            """ Get an item by key """
+            with self.lock:
+                return super().get(key)
+
+        def print_cache(self):
+            """ Print the cache """
+            with self.lock:
+                super().print_cache()
+
+        def reap(self):
+            """ Remove every expired item """
+            with self.lock:
+                return super().reap()
+
+    LockedCache.__name__ = LockedCache.__qualname__ = \
+        "Locked" + cache_class.__name__
+    LockedCache.__doc__ = LockedCache.__doc__.format(cache_class.__name__)
+    return LockedCache
+
+
+class ShardedCache(BaseCaching):
+    """
+    ShardedCache splits the keys between independently locked caches
+
+    A key always goes to the shard picked by its hash, so threads
+    working on different shards never wait for each other. MAX_ITEMS is
+    divided between the shards, and each shard applies the eviction
+    policy of ``cache_class`` to its own keys only; a byte budget is
+    divided the same way.
+    """
+    thread_safe = True
+
+    def __init__(self, cache_class=LRUCache, shards=16, max_items=None,
+                 max_bytes=None, size_of=None, ttl=None):
+        """ Initialize the class """
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        assert isinstance(shards, int) and shards > 0
+        shards = min(shards, self.MAX_ITEMS)
+        locked_class = locked(cache_class)
+        self.shards = []
+        for i in range(shards):
+            # spread the remainders so the shares add up to the totals
+            shard_bytes = None
+            if max_bytes is not None:
+                shard_bytes = max_bytes // shards + (i < max_bytes % shards)
+            self.shards.append(locked_class(
+                self.MAX_ITEMS // shards + (i < self.MAX_ITEMS % shards),
+                shard_bytes, size_of, ttl))
+
+    @property
+    def cache_data(self):
+        """ Snapshot of the items held by every shard """
+        items = {}
+        for shard in self.shards:
+            with shard.lock:
+                items.update(shard.cache_data)
+        return items
+
+    @cache_data.setter
+    def cache_data(self, value):
+        """ The shards hold the data; only the initial empty dict fits """
+        assert not value
+
+    def shard(self, key):
+        """ Return the cache responsible for key """
+        return self.shards[hash(key) % len(self.shards)]
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache """
+        if key is not None and item is not None:
+            self.shard(key).put(key, item, ttl)
+
+    def get(self, key):
+        """ Get an item by key """
+        if key is None:
+            return None
+        return self.shard(key).get(key)
+
+    def reap(self):
+        """ Remove every expired item from every shard """
+        return sum(shard.reap() for shard in self.shards)
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+""" 101-main """
+import contextlib
+import io
+import threading
+
+concurrent_cache = __import__('101-concurrent_cache')
+LRUCache = __import__('3-lru_cache').LRUCache
+locked = concurrent_cache.locked
+ShardedCache = concurrent_cache.ShardedCache
+
+my_cache = locked(LRUCache)()
+print(type(my_cache).__name__)
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+print(my_cache.get("B"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+
+my_cache = ShardedCache(LRUCache, shards=4)
+
+
+def worker(first):
+    """ Put three keys that land in the same shard """
+    for key in range(first, 12, 4):
+        my_cache.put(key, "value {}".format(key))
+
+
+# the shards discard concurrently, so their DISCARD lines interleave in
+# any order; count them instead of printing them
+discards = io.StringIO()
+with contextlib.redirect_stdout(discards):
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+print(discards.getvalue().count("DISCARD: "))
+my_cache.print_cache()
+print(my_cache.get(0))
+print(my_cache.get(11))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+""" ARCCache class that implements an Adaptive Replacement Cache """
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """
+    ARCCache defines an ARC caching system
+
+    Cached keys are split between recent (seen once) and frequent (seen
+    at least twice) lists, each from least to most recently used. Keys
+    evicted from either list are remembered, without their values, in
+    a ghost list of the same kind. Putting a ghost key again moves the
+    target size of the recent list, p, towards the list that lost it,
+    so the cache adapts between recency and frequency, and a one-off
+    scan can only flush the recent list.
+    """
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
+        """ Initialize the class """
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        self.recent = OrderedDict()
+        self.frequent = OrderedDict()
+        self.recent_ghosts = OrderedDict()
+        self.frequent_ghosts = OrderedDict()
+        self.p = 0
+        self.ghost_hit = None
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache """
+        if key is None or item is None:
+            return
+        capacity = self.MAX_ITEMS
+        # a ghost hit says which list was evicted from too eagerly
+        if key in self.recent_ghosts:
+            self.p = min(capacity, self.p + max(
+                1, len(self.frequent_ghosts) // len(self.recent_ghosts)))
+            self.ghost_hit = self.recent_ghosts
+        elif key in self.frequent_ghosts:
+            self.p = max(0, self.p - max(
+                1, len(self.recent_ghosts) // len(self.frequent_ghosts)))
+            self.ghost_hit = self.frequent_ghosts
+        size = self.make_room(key, item)
+        ghost_hit, self.ghost_hit = self.ghost_hit, None
+        if size is None:
+            return
+
+        if key in self.cache_data:
+            self.__touch(key)
+        elif ghost_hit is not None:
+            del ghost_hit[key]
+            self.frequent[key] = None
+        else:
+            self.recent[key] = None
+        self.cache_data[key] = item
+        self.track(key, size, ttl)
+
+        # remember at most capacity keys per side, 2 * capacity in all
+        while self.recent_ghosts and \
+                len(self.recent) + len(self.recent_ghosts) > capacity:
+            self.recent_ghosts.popitem(last=False)
+        while self.frequent_ghosts and len(self.recent_ghosts) + \
+                len(self.frequent_ghosts) + len(self.cache_data) > \
+                2 * capacity:
+            self.frequent_ghosts.popitem(last=False)
+
+    def __touch(self, key):
+        """ Move a cached key to the most recent end of frequent """
+        if key in self.recent:
+            del self.recent[key]
+            self.frequent[key] = None
+        else:
+            self.frequent.move_to_end(key)
+
+    def discard(self, keep=None):
+        """
+        Discard from recent while it is over its target size p,
+        otherwise from frequent, and remember the key as a ghost
+        """
+        recent = self.__oldest(self.recent, keep)
+        frequent = self.__oldest(self.frequent, keep)
+        if recent is not None and (
+                frequent is None or len(self.recent) > self.p or
+                (self.ghost_hit is self.frequent_ghosts and
+                 len(self.recent) == self.p)):
+            key, ghosts = recent, self.recent_ghosts
+        else:
+            key, ghosts = frequent, self.frequent_ghosts
+        self.remove(key)
+        ghosts[key] = None
+        print(f"DISCARD: {key}")
+
+    @staticmethod
+    def __oldest(keys, keep):
+        """ Return the least recently used of keys other than keep """
+        for key in keys:
+            if key != keep:
+                return key
+        return None
+
+    def remove(self, key):
+        """ Remove an item without printing DISCARD """
+        if key in self.recent:
+            del self.recent[key]
+        else:
+            del self.frequent[key]
+        del self.cache_data[key]
+        self.untrack(key)
+
+    def get(self, key):
+        """ Get an item by key """
+        if key is None or key not in self.cache_data:
+            return None
+        if self.expires and self.expired(key):
+            return None
+        self.__touch(key)
+        return self.cache_data[key]
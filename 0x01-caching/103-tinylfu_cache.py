@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+""" TinyLFUCache class that implements a W-TinyLFU caching system """
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+# halves every counter of a sketch row in one bytes.translate call
+HALVE = bytes(i >> 1 for i in range(256))
+# odd multipliers giving each sketch row its own hash of a key
+ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+MASK64 = (1 << 64) - 1
+
+
+class CountMinSketch:
+    """
+    CountMinSketch estimates how often keys were seen in little space
+
+    Each of the rows holds small saturating counters indexed by its own
+    hash of the key, and a key's estimate is its smallest counter. After
+    sample_size increments every counter is halved, so the estimates
+    follow recent popularity rather than all-time totals.
+    """
+    MAX_COUNT = 15
+
+    def __init__(self, width, sample_size):
+        """ Initialize the sketch with width counters per row """
+        bits = max(4, (width - 1).bit_length())
+        # the top bits of a 64-bit product pick the counter
+        self.shift = 64 - bits
+        self.rows = [bytearray(1 << bits) for _ in ROW_SEEDS]
+        self.sample_size = sample_size
+        self.additions = 0
+
+    def increment(self, key):
+        """ Count one more sighting of key """
+        h = hash(key)
+        shift = self.shift
+        for row, seed in zip(self.rows, ROW_SEEDS):
+            i = ((h * seed) & MASK64) >> shift
+            if row[i] < self.MAX_COUNT:
+                row[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def estimate(self, key):
+        """ Return how often key was seen, possibly over-estimated """
+        h = hash(key)
+        shift = self.shift
+        return min(row[((h * seed) & MASK64) >> shift]
+                   for row, seed in zip(self.rows, ROW_SEEDS))
+
+    def age(self):
+        """ Halve every counter """
+        self.rows = [bytearray(row.translate(HALVE)) for row in self.rows]
+        self.additions //= 2
+
+
+class TinyLFUCache(BaseCaching):
+    """
+    TinyLFUCache defines a W-TinyLFU caching system
+
+    New keys enter a small LRU window. When room is needed, the oldest
+    window key competes with the next victim of the main cache, and
+    whichever the frequency sketch has seen less often is discarded.
+    The main cache is a segmented LRU: keys hit in its probation
+    segment move to the protected one, whose overflow falls back to
+    probation. Scans stay in the window and do not displace keys with
+    a track record; aging the sketch lets formerly hot keys go.
+    """
+    WINDOW_SHARE = 0.01
+    PROTECTED_SHARE = 0.8
+
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
+        """ Initialize the class """
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        capacity = self.MAX_ITEMS
+        self.window_size = max(1, int(capacity * self.WINDOW_SHARE))
+        self.protected_size = int(
+            (capacity - self.window_size) * self.PROTECTED_SHARE)
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(capacity, 10 * capacity)
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache """
+        if key is None or item is None:
+            return
+        self.sketch.increment(key)
+        size = self.make_room(key, item)
+        if size is None:
+            return
+        if key in self.cache_data:
+            self.__touch(key)
+        else:
+            self.window[key] = None
+            # the window overflows into the main cache's probation
+            while len(self.window) > self.window_size:
+                old_key, _ = self.window.popitem(last=False)
+                self.probation[old_key] = None
+        self.cache_data[key] = item
+        self.track(key, size, ttl)
+
+    def __touch(self, key):
+        """ Record a hit on a cached key """
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        else:
+            del self.probation[key]
+            self.protected[key] = None
+            while len(self.protected) > self.protected_size:
+                old_key, _ = self.protected.popitem(last=False)
+                self.probation[old_key] = None
+
+    def discard(self, keep=None):
+        """
+        Discard the less frequently seen of the oldest window key and
+        the oldest probation (or else protected) key, other than keep
+        """
+        candidate = self.__oldest(self.window, keep)
+        victim = self.__oldest(self.probation, keep)
+        if victim is None:
+            victim = self.__oldest(self.protected, keep)
+        if victim is None or (candidate is not None and
+                              self.sketch.estimate(candidate) <=
+                              self.sketch.estimate(victim)):
+            self.remove(candidate)
+            print(f"DISCARD: {candidate}")
+            return
+        self.remove(victim)
+        print(f"DISCARD: {victim}")
+        if candidate is not None:
+            # the candidate won its place in the main cache
+            del self.window[candidate]
+            self.probation[candidate] = None
+
+    @staticmethod
+    def __oldest(keys, keep):
+        """ Return the least recently used of keys other than keep """
+        for key in keys:
+            if key != keep:
+                return key
+        return None
+
+    def remove(self, key):
+        """ Remove an item without printing DISCARD """
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                break
+        del self.cache_data[key]
+        self.untrack(key)
+
+    def get(self, key):
+        """ Get an item by key """
+        if key is None:
+            return None
+        self.sketch.increment(key)
+        if key not in self.cache_data:
+            return None
+        if self.expires and self.expired(key):
+            return None
+        self.__touch(key)
+        return self.cache_data[key]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+""" ClockCache class that implements a CLOCK caching system """
+from base_caching import BaseCaching
+
+
+class ClockCache(BaseCaching):
+    """
+    ClockCache defines a CLOCK (second chance) caching system
+
+    Keys sit in a ring of MAX_ITEMS slots allocated up front, each with
+    a reference bit. get only sets the bit of the key's slot, so hits
+    never reorder anything. To discard, the hand sweeps the ring: a key
+    whose bit is set loses it and is passed over, and the first key
+    found without one goes. The result approximates LRU.
+    """
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
+        """ Initialize the class """
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        self.ring = [None] * self.MAX_ITEMS
+        self.referenced = bytearray(self.MAX_ITEMS)
+        self.slots = {}
+        # empty slots, the lowest on top; a discard frees the slot the
+        # next new key takes
+        self.free = list(range(self.MAX_ITEMS - 1, -1, -1))
+        self.hand = 0
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache """
+        if key is None or item is None:
+            return
+        size = self.make_room(key, item)
+        if size is None:
+            return
+        if key in self.cache_data:
+            self.referenced[self.slots[key]] = 1
+        else:
+            slot = self.free.pop()
+            self.ring[slot] = key
+            self.slots[key] = slot
+        self.cache_data[key] = item
+        self.track(key, size, ttl)
+
+    def discard(self, keep=None):
+        """
+        Discard the first key past the hand without its reference bit,
+        clearing the bits passed over, other than keep
+        """
+        ring = self.ring
+        referenced = self.referenced
+        hand = self.hand
+        while True:
+            key = ring[hand]
+            if key is None or key == keep:
+                pass
+            elif referenced[hand]:
+                referenced[hand] = 0
+            else:
+                break
+            hand += 1
+            if hand == len(ring):
+                hand = 0
+        self.hand = hand + 1 if hand + 1 < len(ring) else 0
+        self.remove(key)
+        print(f"DISCARD: {key}")
+
+    def remove(self, key):
+        """ Remove an item without printing DISCARD """
+        slot = self.slots.pop(key)
+        self.ring[slot] = None
+        self.referenced[slot] = 0
+        self.free.append(slot)
+        del self.cache_data[key]
+        self.untrack(key)
+
+    def get(self, key):
+        """ Get an item by key """
+        # slots never holds None
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        if self.expires and self.expired(key):
+            return None
+        self.referenced[slot] = 1
+        return self.cache_data[key]
@@ -2,50 +2,64 @@
 """
 LRUCache module
 """
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
 class LRUCache(BaseCaching):
     """
     LRUCache defines a LRU caching system
+
+    cache_data is an OrderedDict kept from least to most recently used,
+    so get, put and eviction are all O(1).
     """
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
         """ Initialize the class """
-        super().__init__()
-        self.order = []
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache
         """
         if key is not None and item is not None:
-            # If key already exists,
-            # update the value and change order
+            # Discard front items while the cache is full
+            size = self.make_room(key, item)
+            if size is None:
+                return
             # any time you try to put item to cache,
-            # it is most recently used
-            # move it to the back
-            if key in self.cache_data:
-                self.cache_data[key] = item
-                self.order.remove(key)
-                self.order.append(key)
-            # If adding a new item
-            else:
-                # and the cache exceeds MAX_ITEMS, discard last item
-                if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                    lru_key = self.order.pop(0)
-                    del self.cache_data[lru_key]
-                    print(f"DISCARD: {lru_key}")
-
-                # Add the new item to cache and keep track of its order
-                self.cache_data[key] = item
-                self.order.append(key)
+            # it is most recently used: it goes to the back
+            self.cache_data[key] = item
+            self.cache_data.move_to_end(key)
+            self.track(key, size, ttl)
+
+    def discard(self, keep=None):
+        """
+        Discard the least recently used item, other than keep
+        """
+        lru_key = next(iter(self.cache_data))
+        if lru_key == keep:
+            lru_key = next(k for k in self.cache_data if k != keep)
+        del self.cache_data[lru_key]
+        self.untrack(lru_key)
+        print(f"DISCARD: {lru_key}")
+
+    def remove(self, key):
+        """
+        Remove an item without printing DISCARD
+        """
+        del self.cache_data[key]
+        self.untrack(key)
 
     def get(self, key):
         """ Get an item by key """
         if key is None or key not in self.cache_data:
             return None
+        if self.expires and self.expired(key):
+            return None
 
         # Move the accessed key to the end to mark it as recently used
-        self.order.remove(key)
-        self.order.append(key)
+        self.cache_data.move_to_end(key)
         return self.cache_data[key]
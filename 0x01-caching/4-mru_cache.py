@@ -2,6 +2,8 @@
 """
 MRUCache module
 """
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
@@ -9,16 +11,23 @@ class MRUCache(BaseCaching):
     """
     MRUCache defines a LRU caching system
     """
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
         """ Initialize the class """
-        super().__init__()
-        self.order = []
+        super().__init__(max_items, max_bytes, size_of, ttl)
+        # keys from least to most recently used; an OrderedDict so
+        # moving or removing one is O(1)
+        self.order = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Add an item in the cache
         """
         if key is not None and item is not None:
+            # Discard most recently used items while the cache is full
+            size = self.make_room(key, item)
+            if size is None:
+                return
             # If key already exists,
             # update the value and change order
             # any time you try to put item to cache,
@@ -26,26 +35,39 @@ class MRUCache(BaseCaching):
             # move it to the back
             if key in self.cache_data:
                 self.cache_data[key] = item
-                self.order.remove(key)
-                self.order.append(key)
+                self.order.move_to_end(key)
             # If adding a new item
             else:
-                # and the cache exceeds MAX_ITEMS, discard last item
-                if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                    mru_key = self.order.pop()
-                    del self.cache_data[mru_key]
-                    print(f"DISCARD: {mru_key}")
-
                 # Add the new item to cache and keep track of its order
                 self.cache_data[key] = item
-                self.order.append(key)
+                self.order[key] = None
+            self.track(key, size, ttl)
 
     def get(self, key):
         """ Get an item by key """
         if key is None or key not in self.cache_data:
             return None
+        if self.expires and self.expired(key):
+            return None
 
         # Move the accessed key to the end to mark it as recently used
-        self.order.remove(key)
-        self.order.append(key)
+        self.order.move_to_end(key)
         return self.cache_data[key]
+
+    def discard(self, keep=None):
+        """
+        Discard the most recently used item, other than keep
+        """
+        mru_key = next(k for k in reversed(self.order) if k != keep)
+        del self.order[mru_key]
+        del self.cache_data[mru_key]
+        self.untrack(mru_key)
+        print(f"DISCARD: {mru_key}")
+
+    def remove(self, key):
+        """
+        Remove an item without printing DISCARD
+        """
+        del self.cache_data[key]
+        del self.order[key]
+        self.untrack(key)
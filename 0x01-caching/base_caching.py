@@ -1,18 +1,51 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import heapq
+import sys
+import threading
+import time
+import weakref
+from itertools import count
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the optional byte budget every eviction policy respects
+      - the optional time to live after which items expire
     """
     MAX_ITEMS = 4
+    # True for caches whose methods may be called from several threads
+    thread_safe = False
+    clock = staticmethod(time.monotonic)
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, size_of=None,
+                 ttl=None):
         """ Initiliaze
+          - max_items: capacity of this cache, MAX_ITEMS by default
+          - max_bytes: optional limit on the summed size of the items
+          - size_of: function giving an item's size, sys.getsizeof
+            by default
+          - ttl: default time to live of an item in seconds, None for
+            items that never expire
         """
         self.cache_data = {}
+        if max_items is not None:
+            assert isinstance(max_items, int) and max_items > 0
+            self.MAX_ITEMS = max_items
+        self.max_bytes = max_bytes
+        self.size_of = size_of or sys.getsizeof
+        self.sizes = {}
+        self.used_bytes = 0
+        self.ttl = ttl
+        # deadline per expiring key, plus a heap of (deadline, n, key)
+        # that may hold stale entries for keys put again since
+        self.expires = {}
+        self.expiry_heap = []
+        self.expiry_count = count()
+        self.reaper_stop = None
 
     def print_cache(self):
         """ Print the cache
@@ -21,7 +54,131 @@ class BaseCaching():
         for key in sorted(self.cache_data.keys()):
             print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
+    def make_room(self, key, item):
+        """ Discard items until item can be stored under key
+          Returns the item's size (0 without a byte budget), or None
+          when the item is larger than max_bytes and must not be put;
+          an older item under key is then removed, not left in place.
+        """
+        if self.expiry_heap:
+            self.reap()
+        if self.max_bytes is None:
+            while self.cache_data and key not in self.cache_data and \
+                    len(self.cache_data) >= self.MAX_ITEMS:
+                self.discard(key)
+            return 0
+
+        size = self.size_of(item)
+        if size > self.max_bytes:
+            if key in self.cache_data:
+                self.remove(key)
+            return None
+        while len(self.cache_data) > (key in self.cache_data):
+            if key not in self.cache_data and \
+                    len(self.cache_data) >= self.MAX_ITEMS:
+                self.discard(key)
+            elif self.used_bytes - self.sizes.get(key, 0) + size > \
+                    self.max_bytes:
+                self.discard(key)
+            else:
+                break
+        return size
+
+    def track(self, key, size, ttl=None):
+        """ Account for the size and lifetime of the item just stored
+          under key; ttl falls back to the cache's default
+        """
+        if self.max_bytes is not None:
+            self.used_bytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is None:
+            if self.expires:
+                self.expires.pop(key, None)
+            return
+        deadline = self.clock() + ttl
+        self.expires[key] = deadline
+        heapq.heappush(self.expiry_heap,
+                       (deadline, next(self.expiry_count), key))
+        if len(self.expiry_heap) > 2 * len(self.expires) + 64:
+            # drop the entries of keys that were put again
+            self.expiry_heap = [(d, next(self.expiry_count), k)
+                                for k, d in self.expires.items()]
+            heapq.heapify(self.expiry_heap)
+
+    def untrack(self, key):
+        """ Forget the size and lifetime of a removed item
+        """
+        if self.max_bytes is not None:
+            self.used_bytes -= self.sizes.pop(key, 0)
+        if self.expires:
+            self.expires.pop(key, None)
+
+    def expired(self, key):
+        """ Remove the item under key if its time to live ran out
+          Returns True if it did.
+        """
+        deadline = self.expires.get(key)
+        if deadline is None or deadline > self.clock():
+            return False
+        self.remove(key)
+        return True
+
+    def reap(self):
+        """ Remove every expired item, soonest deadline first
+          Returns how many items were removed.
+        """
+        heap = self.expiry_heap
+        now = self.clock()
+        removed = 0
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(heap)
+            if self.expires.get(key) == deadline:
+                self.remove(key)
+                removed += 1
+        return removed
+
+    def start_reaper(self, interval):
+        """ Reap expired items every interval seconds on a daemon thread
+          The cache must be thread safe (see 101-concurrent_cache).
+        """
+        assert self.thread_safe, "the reaper needs a thread-safe cache"
+        self.stop_reaper()
+        stop = self.reaper_stop = threading.Event()
+        cache_ref = weakref.ref(self)
+
+        def run():
+            while not stop.wait(interval):
+                cache = cache_ref()
+                if cache is None:
+                    return
+                cache.reap()
+                del cache
+
+        threading.Thread(target=run, name="cache-reaper",
+                         daemon=True).start()
+
+    def stop_reaper(self):
+        """ Stop the background reaper, if any
+        """
+        if self.reaper_stop is not None:
+            self.reaper_stop.set()
+            self.reaper_stop = None
+
+    def remove(self, key):
+        """ Remove the item under key without printing DISCARD
+        """
+        raise NotImplementedError(
+            "remove must be implemented in your cache class")
+
+    def discard(self, keep=None):
+        """ Discard one item, never the one under keep
+        """
+        raise NotImplementedError(
+            "discard must be implemented in your cache class")
+
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
         """
         raise NotImplementedError("put must be implemented in your cache class")
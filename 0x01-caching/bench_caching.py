@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the caching systems
+
+Usage: ./bench_caching.py [latency] [threads] [policies]
+"""
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from itertools import accumulate
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+concurrent_cache = __import__('101-concurrent_cache')
+ARCCache = __import__('102-arc_cache').ARCCache
+TinyLFUCache = __import__('103-tinylfu_cache').TinyLFUCache
+ClockCache = __import__('104-clock_cache').ClockCache
+
+SIZES = (4, 64, 1024, 16384, 262144, 1048576)
+OPS = 200000
+THREADS = (1, 2, 4, 8)
+CAPACITY = 4096
+POLICIES = (FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache, ARCCache,
+            TinyLFUCache, ClockCache)
+TRACE_KEYS = 10000
+TRACE_LENGTH = 200000
+TRACE_CAPACITY = 1000
+
+
+def per_op_latency(cache_class, size, ops=OPS, seed=0):
+    """
+    Returns the mean seconds per operation of a cache holding ``size``
+    entries, under a mix of hits, misses and evicting puts.
+    """
+    cache = cache_class(max_items=size)
+    rand = random.Random(seed)
+    # keys drawn from twice the capacity: about half the gets miss
+    keys = [rand.randrange(2 * size) for _ in range(ops)]
+    is_put = [rand.random() < 0.5 for _ in range(ops)]
+
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        for key in range(size):
+            cache.put(key, key)
+        start = time.perf_counter()
+        for key, put in zip(keys, is_put):
+            if put:
+                cache.put(key, key)
+            else:
+                cache.get(key)
+        elapsed = time.perf_counter() - start
+    return elapsed / ops
+
+
+def throughput(cache, threads, ops=OPS, seed=0):
+    """
+    Returns the operations per second ``threads`` threads reach on one
+    shared cache, each doing its share of ``ops`` random gets and puts
+    over keys from twice CAPACITY.
+    """
+    rand = random.Random(seed)
+    per_thread = ops // threads
+    workloads = [[(rand.random() < 0.5, rand.randrange(2 * CAPACITY))
+                  for _ in range(per_thread)] for _ in range(threads)]
+    start_line = threading.Barrier(threads + 1)
+
+    def work(workload):
+        start_line.wait()
+        for put, key in workload:
+            if put:
+                cache.put(key, key)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=work, args=(workload,))
+               for workload in workloads]
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        for worker in workers:
+            worker.start()
+        start_line.wait()
+        start = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed
+
+
+def one_lock(cache_class):
+    """ cache_class of CAPACITY entries behind a single lock """
+    return concurrent_cache.locked(cache_class)(max_items=CAPACITY)
+
+
+def zipf_keys(rand, length, keys=TRACE_KEYS, skew=0.99):
+    """ Return length keys drawn from a Zipf distribution over keys """
+    weights = accumulate(1 / (rank + 1) ** skew for rank in range(keys))
+    return rand.choices(range(keys), cum_weights=list(weights), k=length)
+
+
+def traces(seed=0):
+    """
+    Return the benchmark traces by name:
+      - zipf: a skewed, stable popularity
+      - scan: the same, interrupted by one-off scans of fresh keys
+      - shift: the hot keys change completely four times
+    """
+    rand = random.Random(seed)
+    zipf = zipf_keys(rand, TRACE_LENGTH)
+
+    scan = []
+    fresh = TRACE_KEYS
+    for start in range(0, TRACE_LENGTH, 20000):
+        scan.extend(zipf[start:start + 15000])
+        scan.extend(range(fresh, fresh + 5000))
+        fresh += 5000
+
+    phase = TRACE_LENGTH // 5
+    shift = [(key + i // phase * TRACE_KEYS) for i, key in enumerate(zipf)]
+    return {"zipf": zipf, "scan": scan, "shift": shift}
+
+
+def replay(cache, trace):
+    """
+    Read every key of trace through the cache, putting it on a miss
+    Returns the hit rate and the operations per second.
+    """
+    hits = 0
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for key in trace:
+            if cache.get(key) is None:
+                cache.put(key, key)
+            else:
+                hits += 1
+        elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+def latency_table():
+    """ Print ns/op of LRU, LFU and CLOCK by number of entries """
+    caches = (LRUCache, LFUCache, ClockCache)
+    print("ns/op by number of entries")
+    print("{:>10}".format("entries") + "".join(
+        "{:>12}".format(cache.__name__) for cache in caches))
+    for size in SIZES:
+        print("{:>10}".format(size) + "".join(
+            "{:>12.0f}".format(per_op_latency(cache, size) * 1e9)
+            for cache in caches))
+
+
+def threads_table():
+    """ Print the ops/sec of shared caches by number of threads """
+    print("ops/sec by number of threads")
+    print("{:>10}{:>12}{:>12}{:>12}".format(
+        "threads", "one lock", "sharded", "CLOCK lock"))
+    for threads in THREADS:
+        print("{:>10}{:>12.0f}{:>12.0f}{:>12.0f}".format(
+            threads, throughput(one_lock(LRUCache), threads),
+            throughput(concurrent_cache.ShardedCache(
+                LRUCache, max_items=CAPACITY), threads),
+            throughput(one_lock(ClockCache), threads)))
+
+
+def policies_table():
+    """ Print the hit rate and ops/sec of every policy on each trace """
+    print("hit rate % / kops/sec, {} entries over {} keys".format(
+        TRACE_CAPACITY, TRACE_KEYS))
+    print("{:>8}".format("trace") + "".join(
+        "{:>15}".format(policy.__name__[:-5]) for policy in POLICIES))
+    for name, trace in traces().items():
+        cells = []
+        for policy in POLICIES:
+            hit_rate, ops = replay(policy(max_items=TRACE_CAPACITY), trace)
+            cells.append("{:>8.1f} /{:>5.0f}".format(
+                hit_rate * 100, ops / 1000))
+        print("{:>8}".format(name) + "".join(cells))
+
+
+if __name__ == "__main__":
+    tables = {"latency": latency_table, "threads": threads_table,
+              "policies": policies_table}
+    for name in sys.argv[1:] or tables:
+        tables[name]()
+        print()